@@ -4,16 +4,38 @@
 # Keep this file light to avoid circular imports and heavy import time.
 
 from .pdf import generate_report  # unified entry point that handles format='pdf' or 'docx'
-
-# (Optional) also expose the format-specific builders if you want:
-from .pdf import _generate_pdf_report as generate_pdf_report  # optional public alias
-from .docx import _generate_docx_report as generate_docx_report  # optional public alias
+from .pdf import generate_pdf_reports_batch  # many PDFs across worker processes
+# Note: background_svg files are parsed once and cached by (path, mtime, size),
+# so treat them as immutable while generate_report runs.
 
 # (Optional) expose theme tokens for customization:
 from .theme import report_colors
 
+# (Optional) format-specific builders, resolved on first access (PEP 562)
+# so a PDF-only caller never imports python-docx/lxml.
+_LAZY_EXPORTS = {
+    "generate_pdf_report": (".pdf", "_generate_pdf_report"),
+    "generate_docx_report": (".docx", "_generate_docx_report"),
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+
+        module_name, attr = _LAZY_EXPORTS[name]
+        value = getattr(import_module(module_name, __name__), attr)
+        globals()[name] = value  # cache: later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 __all__ = [
     "generate_report",
+    "generate_pdf_reports_batch",
     "generate_pdf_report",
     "generate_docx_report",
     "report_colors",
@@ -1,12 +1,19 @@
 import os
+import re
+import stat
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
 import pandas as pd
+from lxml import etree
 from docx import Document
 from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.shared import OxmlElement
-from docx.oxml.ns import qn
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
 
-from .utils import prepare_dataframe, format_value
+from .utils import prepare_dataframe, format_value, _select_table_frame, hex_to_rgb, _compile_formatter
 from .theme import report_colors
 
 
@@ -23,6 +30,83 @@ report_colors = {
     'section_subtitle': '#888888',  # Section subtitle text (lighter grey)
 }
 
+_W_SHD = qn('w:shd')
+_W_FILL = qn('w:fill')
+_W_W = qn('w:w')
+_WHITE = RGBColor(255, 255, 255)
+_RUN_BREAKS = re.compile(r'([\t\r\n])')
+_BODY_CHUNK_ROWS = 256  # table rows formatted/parsed per batch
+
+# ==================== RENDER HELPERS ====================
+def _add_subtitle(doc, text, hex_color, size=12):
+    """Add an italic, colored subtitle paragraph (shared by all section renderers)"""
+    para = doc.add_paragraph(text)
+    font = para.runs[0].font
+    font.size = Pt(size)
+    font.italic = True
+    font.color.rgb = _rgb(hex_color)
+    return para
+
+def _image_ok(image_path):
+    """
+    True if image_path is an existing, non-empty regular file.
+    Checked with one stat per render and never remembered, so an image
+    deleted or emptied since an earlier report is skipped, not loaded.
+    """
+    try:
+        st = os.stat(image_path)
+    except OSError:
+        return False
+    return stat.S_ISREG(st.st_mode) and st.st_size > 0
+
+@lru_cache(maxsize=256)
+def _rgb(hex_color):
+    """Cached hex -> RGBColor; the same few theme colors repeat across sections"""
+    return RGBColor(*hex_to_rgb(hex_color))
+
+def _run_xml(text):
+    """w:r content for text, matching python-docx's Run.text (tabs/newlines become elements)"""
+    parts = []
+    for chunk in _RUN_BREAKS.split(text):
+        if chunk == '\t':
+            parts.append('<w:tab/>')
+        elif chunk in ('\r', '\n'):
+            parts.append('<w:br/>')
+        elif chunk:
+            space = ' xml:space="preserve"' if len(chunk.strip()) < len(chunk) else ''
+            parts.append(f'<w:t{space}>{escape(chunk)}</w:t>')
+    return ''.join(parts)
+
+def _append_body_rows(table, df, formatters, alt_fill, cell_formats=None):
+    """
+    Append body rows straight into the w:tbl element, _BODY_CHUNK_ROWS at a time.
+    Cells are not filled through python-docx (which builds and re-walks an
+    element tree per cell), and only one chunk of formatted text / XML is
+    alive at once. Produces the same XML as cell.text + font.size + w:shd.
+    cell_formats keys are (row, col) with row 1 = first body row, as in PDF.
+    """
+    tbl = table._tbl
+    widths = [col.get(_W_W) for col in tbl.tblGrid.gridCol_lst]
+    cell_open = [f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{w}"/>' for w in widths]
+    shade = f'<w:shd w:fill="{alt_fill}"/>'
+    run_open = '</w:tcPr><w:p><w:r><w:rPr><w:sz w:val="22"/></w:rPr>'
+    run_close = '</w:r></w:p></w:tc>'
+    ns = nsdecls('w')
+
+    for start in range(0, len(df), _BODY_CHUNK_ROWS):
+        chunk = df.iloc[start:start + _BODY_CHUNK_ROWS]
+        columns = [fmt(chunk.iloc[:, j]) for j, fmt in enumerate(formatters)]
+        for (r, c), spec in (cell_formats or {}).items():
+            if start < r <= start + len(chunk) and 0 <= c < len(columns) and spec:
+                columns[c][r - 1 - start] = format_value(chunk.iat[r - 1 - start, c], spec)
+        parts = []
+        for i, row_data in enumerate(zip(*columns), start=start + 1):
+            shd = shade if i % 2 == 0 else ''
+            parts.append('<w:tr>')
+            parts.extend(f'{tc}{shd}{run_open}{_run_xml(str(v))}{run_close}' for tc, v in zip(cell_open, row_data))
+            parts.append('</w:tr>')
+        tbl.extend(list(parse_xml(f'<w:tbl {ns}>{"".join(parts)}</w:tbl>')))
+
 # ==================== DOCX RENDERER FUNCTIONS ====================
 def render_docx_title(doc, section_config, theme):
     """Render title section in DOCX"""
@@ -34,13 +118,9 @@ def render_docx_title(doc, section_config, theme):
         title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
     if subtitle:
-        subtitle_para = doc.add_paragraph(subtitle)
+        subtitle_color = section_config.get('subtitle_color', theme['subtitle'])
+        subtitle_para = _add_subtitle(doc, subtitle, subtitle_color, size=14)
         subtitle_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        subtitle_para.runs[0].font.size = Pt(14)
-        subtitle_para.runs[0].font.italic = True
-        subtitle_hex = section_config.get('subtitle_color', theme['subtitle']).replace('#', '')
-        subtitle_rgb = tuple(int(subtitle_hex[i:i+2], 16) for i in (0, 2, 4))
-        subtitle_para.runs[0].font.color.rgb = RGBColor(*subtitle_rgb)
 
     doc.add_paragraph()
 
@@ -56,12 +136,7 @@ def render_docx_text(doc, section_config, theme):
 
     subtitle = section_config.get('subtitle')
     if subtitle:
-        subtitle_para = doc.add_paragraph(subtitle)
-        subtitle_para.runs[0].font.size = Pt(12)
-        subtitle_para.runs[0].font.italic = True
-        subtitle_hex = theme['section_subtitle'].replace('#', '')
-        subtitle_rgb = tuple(int(subtitle_hex[i:i+2], 16) for i in (0, 2, 4))
-        subtitle_para.runs[0].font.color.rgb = RGBColor(*subtitle_rgb)
+        _add_subtitle(doc, subtitle, theme['section_subtitle'])
 
     style = section_config.get('style', 'normal')
     alignment = section_config.get('alignment', 'left')
@@ -86,7 +161,7 @@ def render_docx_text(doc, section_config, theme):
 def render_docx_image(doc, section_config, theme):
     """Render an image section in DOCX"""
     image_path = section_config.get('image_path', '')
-    if not image_path or not os.path.exists(image_path):
+    if not image_path or not _image_ok(image_path):
         return
 
     title = section_config.get('title')
@@ -95,12 +170,7 @@ def render_docx_image(doc, section_config, theme):
 
     subtitle = section_config.get('subtitle')
     if subtitle:
-        subtitle_para = doc.add_paragraph(subtitle)
-        subtitle_para.runs[0].font.size = Pt(12)
-        subtitle_para.runs[0].font.italic = True
-        subtitle_hex = theme['section_subtitle'].replace('#', '')
-        subtitle_rgb = tuple(int(subtitle_hex[i:i+2], 16) for i in (0, 2, 4))
-        subtitle_para.runs[0].font.color.rgb = RGBColor(*subtitle_rgb)
+        _add_subtitle(doc, subtitle, theme['section_subtitle'])
 
     caption = section_config.get('caption')
     if caption:
@@ -119,19 +189,7 @@ def render_docx_table(doc, section_config, theme):
     if len(df) == 0:
         return
 
-    df_work = df.copy()
-
-    if section_config.get('clean_empty_cols'):
-        df_work = df_work.dropna(axis=1, how='all')
-        df_work = df_work.loc[:, (df_work != '').any(axis=0)]
-
-    if section_config.get('clean_empty_rows'):
-        df_work = df_work.dropna(axis=0, how='all')
-        df_work = df_work[(df_work.astype(str) != '').any(axis=1)]
-
-    if 'drop_columns' in section_config:
-        drop_cols = section_config['drop_columns']
-        df_work = df_work.drop(columns=[c for c in drop_cols if c in df_work.columns])
+    df_work = _select_table_frame(df, section_config)
 
     if len(df_work) == 0:
         return
@@ -150,43 +208,31 @@ def render_docx_table(doc, section_config, theme):
 
     subtitle = section_config.get('subtitle')
     if subtitle:
-        subtitle_para = doc.add_paragraph(subtitle)
-        subtitle_para.runs[0].font.size = Pt(12)
-        subtitle_para.runs[0].font.italic = True
-        subtitle_hex = theme['section_subtitle'].replace('#', '')
-        subtitle_rgb = tuple(int(subtitle_hex[i:i+2], 16) for i in (0, 2, 4))
-        subtitle_para.runs[0].font.color.rgb = RGBColor(*subtitle_rgb)
+        _add_subtitle(doc, subtitle, theme['section_subtitle'])
 
     section_colors = section_config.get('colors', theme)
-    header_hex = section_colors['header_bg'].replace('#', '')
-    header_rgb = tuple(int(header_hex[i:i+2], 16) for i in (0, 2, 4))
-    row_alt_hex = section_colors['row_alt'].replace('#', '')
-    row_alt_rgb = tuple(int(row_alt_hex[i:i+2], 16) for i in (0, 2, 4))
 
-    table_data = [df_work.columns.tolist()]
-    for _, row in df_work.iterrows():
-        table_data.append([format_value(v) for v in row])
+    header = df_work.columns.tolist()
+    # Resolve column_formats once per table (cell_formats override per cell)
+    column_formats = section_config.get('column_formats') or {}
+    formatters = [_compile_formatter(column_formats.get(col), dtype)
+                  for col, dtype in zip(header, df_work.dtypes)]
 
-    table = doc.add_table(rows=len(table_data), cols=len(df_work.columns))
+    table = doc.add_table(rows=1, cols=len(header))
     table.style = 'Table Grid'
 
+    header_fill = section_colors['header_bg'].replace('#', '')
+
     for j, cell in enumerate(table.rows[0].cells):
-        cell.text = str(table_data[0][j])
-        cell.paragraphs[0].runs[0].font.bold = True
-        cell.paragraphs[0].runs[0].font.size = Pt(11)
-        cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(255, 255, 255)
-        shading_elm = OxmlElement('w:shd')
-        shading_elm.set(qn('w:fill'), section_colors['header_bg'].replace('#', ''))
-        cell._element.get_or_add_tcPr().append(shading_elm)
-
-    for i, row_data in enumerate(table_data[1:], start=1):
-        for j, cell in enumerate(table.rows[i].cells):
-            cell.text = str(row_data[j])
-            cell.paragraphs[0].runs[0].font.size = Pt(11)
-            if i % 2 == 0:
-                shading_elm = OxmlElement('w:shd')
-                shading_elm.set(qn('w:fill'), section_colors['row_alt'].replace('#', ''))
-                cell._element.get_or_add_tcPr().append(shading_elm)
+        cell.text = str(header[j])
+        font = cell.paragraphs[0].runs[0].font
+        font.bold = True
+        font.size = Pt(11)
+        font.color.rgb = _WHITE
+        etree.SubElement(cell._element.get_or_add_tcPr(), _W_SHD).set(_W_FILL, header_fill)
+
+    _append_body_rows(table, df_work, formatters, section_colors['row_alt'].replace('#', ''),
+                      section_config.get('cell_formats'))
 
     doc.add_paragraph()
 
@@ -202,44 +248,81 @@ def render_docx_table_grouped(doc, section_config, theme):
 
     subtitle = section_config.get('subtitle')
     if subtitle:
-        subtitle_para = doc.add_paragraph(subtitle)
-        subtitle_para.runs[0].font.size = Pt(12)
-        subtitle_para.runs[0].font.italic = True
-        subtitle_hex = theme['section_subtitle'].replace('#', '')
-        subtitle_rgb = tuple(int(subtitle_hex[i:i+2], 16) for i in (0, 2, 4))
-        subtitle_para.runs[0].font.color.rgb = RGBColor(*subtitle_rgb)
+        _add_subtitle(doc, subtitle, theme['section_subtitle'])
 
     category_order = section_config.get('category_order', df[groupby_col].unique())
 
+    # One groupby pass instead of a boolean scan of df per category
+    groups = dict(iter(df.groupby(groupby_col, sort=False, observed=True)))
+
+    # Shared per-group config; only title/df change between categories
+    group_config = dict(section_config, type='table')
+
     for category in category_order:
-        df_cat = df[df[groupby_col] == category]
-        if len(df_cat) == 0:
+        df_cat = groups.get(category)
+        if df_cat is None or len(df_cat) == 0:
             continue
 
-        section_copy = section_config.copy()
-        section_copy['title'] = category
-        section_copy['df'] = df_cat
-        section_copy['type'] = 'table'
+        group_config['title'] = category
+        group_config['df'] = df_cat
 
-        render_docx_table(doc, section_copy, theme)
+        render_docx_table(doc, group_config, theme)
 
-def _generate_docx_report(report_sections, output_filename, theme):
-    """Generate DOCX report"""
-    doc = Document()
+_SECTION_RENDERERS = {
+    'title': render_docx_title,
+    'text': render_docx_text,
+    'image': render_docx_image,
+    'table': render_docx_table,
+    'table_grouped': render_docx_table_grouped,
+}
+
+# Sections worth shipping to a worker process; images stay in the parent
+# because add_picture registers a package part the spliced XML can't carry.
+_PARALLEL_TYPES = ('table', 'table_grouped')
+_MIN_PARALLEL_SECTIONS = 3
 
-    for section in report_sections:
-        section_type = section['type']
+def _render_docx_section(doc, section, theme):
+    renderer = _SECTION_RENDERERS.get(section['type'])
+    if renderer:
+        renderer(doc, section, theme)
+
+def _render_section_body_xml(section, theme):
+    """Worker: render one section into a scratch Document and return its body XML"""
+    doc = Document()
+    _render_docx_section(doc, section, theme)
+    return etree.tostring(doc.element.body)
+
+def _splice_body_xml(doc, body_xml):
+    sect_pr = doc.element.body.sectPr
+    for child in parse_xml(body_xml):
+        if child.tag != sect_pr.tag:
+            sect_pr.addprevious(child)
+
+def _generate_docx_report(report_sections, output_filename, theme, max_workers=None):
+    """
+    Generate DOCX report
+
+    Args:
+        max_workers: Render table sections in this many worker processes
+            (opt-in; callers on spawn-based platforms need a __main__ guard).
+            Falls back to sequential rendering when there are few tables.
+    """
+    doc = Document()
 
-        if section_type == 'title':
-            render_docx_title(doc, section, theme)
-        elif section_type == 'text':
-            render_docx_text(doc, section, theme)
-        elif section_type == 'image':
-            render_docx_image(doc, section, theme)
-        elif section_type == 'table':
-            render_docx_table(doc, section, theme)
-        elif section_type == 'table_grouped':
-            render_docx_table_grouped(doc, section, theme)
+    heavy = [i for i, s in enumerate(report_sections) if s['type'] in _PARALLEL_TYPES]
+    if not max_workers or max_workers < 2 or len(heavy) < _MIN_PARALLEL_SECTIONS:
+        for section in report_sections:
+            _render_docx_section(doc, section, theme)
+        doc.save(output_filename)
+        return output_filename
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {i: pool.submit(_render_section_body_xml, report_sections[i], theme) for i in heavy}
+        for i, section in enumerate(report_sections):
+            if i in futures:
+                _splice_body_xml(doc, futures[i].result())
+            else:
+                _render_docx_section(doc, section, theme)
 
     doc.save(output_filename)
-    return output_filename
\ No newline at end of file
+    return output_filename
@@ -1,147 +1,193 @@
+"""
+PDF backend: section renderers, header/footer/background page callbacks and
+the generate_report entry point.
+
+Speed vs validation: ReportLab graphics shapes (svglib backgrounds, separator
+lines) validate every attribute assignment while rl_config.shapeChecking is
+on. That catches bad shape attributes early but costs time on every
+assignment, so this module switches it off at import. Set the
+REPORTLABCUSTOM_DEBUG environment variable (any non-empty value) before
+importing reportlabcustom to keep ReportLab's checking while developing.
+
+Import order (as of ReportLab 5.0): validation itself reads the flag on every
+assignment, so turning it off at any point stops the checks. Turning it off
+before reportlab.graphics.shapes is first imported also skips installing the
+per-assignment Shape.__setattr__ hook, which is why the switch sits above the
+graphics imports below. If another module imported the graphics package
+first, checking is still off; only that hook's call overhead remains.
+"""
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+from reportlab import rl_config
+
+# Speed over shape validation unless REPORTLABCUSTOM_DEBUG is set (see module docstring)
+if not os.environ.get('REPORTLABCUSTOM_DEBUG'):
+    rl_config.shapeChecking = 0
+
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
+from reportlab.pdfgen.canvas import Canvas
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import Paragraph, Spacer, Table, TableStyle, KeepTogether, BaseDocTemplate, PageTemplate, Frame
-from reportlab.platypus.flowables import Flowable
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle, KeepTogether, Image, CondPageBreak, BaseDocTemplate, PageTemplate, Frame
 from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Drawing, Line
 
-from .utils import prepare_dataframe, format_value, evaluate_formatting_rules, load_and_scale_svg
+from .utils import prepare_dataframe, format_value, _select_table_frame, evaluate_formatting_rules, load_and_scale_svg, _compile_formatter
 from .theme import report_colors
 
+@lru_cache(maxsize=512)
+def _hex(hex_color):
+    """Cached colors.HexColor; the same theme colors repeat per row, cell and page"""
+    return colors.HexColor(hex_color)
+
+
 # ==================== HEADER AND FOOTER DRAWING ====================
 
-def draw_footer(canvas, doc, footer_config):
-    """Draw three-zone footer with flexible positioning"""
-    canvas.saveState()
-    
+def _footer_drawer(footer_config, isolated=True):
+    """
+    Resolve a footer config once per document; returns draw(canvas, total_pages)
+    that only formats the page number and paints on each page.
+    isolated=False skips saveState/restoreState, for drawing that ends the page.
+    """
+    get = footer_config.get
     page_width = letter[0]
     footer_y = 0.5 * inch
-    
-    font_size = footer_config.get('font_size', 9)
-    text_color = footer_config.get('text_color', '#666666')
-    
-    canvas.setFont("Helvetica", font_size)
-    canvas.setFillColor(colors.HexColor(text_color))
-    
+
+    font_size = get('font_size', 9)
+    text_color = _hex(get('text_color', '#666666'))
+
     # Get page number config
-    page_num_config = footer_config.get('page_numbers', {})
+    page_num_config = get('page_numbers', {})
     page_num_position = page_num_config.get('position', 'center')
     page_num_format = page_num_config.get('format', 'Page {n} of {total}')
-    
-    # Get total page count from doc (stored by two-pass rendering)
-    current_page = canvas.getPageNumber()
-    total_pages = getattr(doc, '_total_page_count', current_page)  # ← FIX: Use stored total
-    
-    # Build page number text
-    page_num_text = page_num_format.format(
-        n=current_page,
-        total=total_pages
-    )
-    
-    # Define zones (page numbers take priority)
-    zones = {'left': None, 'center': None, 'right': None}
-    zones[page_num_position] = page_num_text
-    
-    # Add custom text to remaining zones
-    if zones['left'] is None:
-        zones['left'] = footer_config.get('text_left')
-    if zones['center'] is None:
-        zones['center'] = footer_config.get('text_center')
-    if zones['right'] is None:
-        zones['right'] = footer_config.get('text_right')
-    
-    # Draw each zone
-    if zones['left']:
-        canvas.drawString(0.75 * inch, footer_y, str(zones['left']))
-    if zones['center']:
-        canvas.drawCentredString(page_width / 2.0, footer_y, str(zones['center']))
-    if zones['right']:
-        canvas.drawRightString(page_width - 0.75 * inch, footer_y, str(zones['right']))
-    
+
+    # Custom text per zone; the page number takes priority over its zone
+    zones = {zone: get(f'text_{zone}') for zone in ('left', 'center', 'right')}
+    left_x, center_x, right_x = 0.75 * inch, page_width / 2.0, page_width - 0.75 * inch
+
     # Optional separator line above footer
-    if footer_config.get('draw_line', False):
-        line_color = footer_config.get('line_color', '#CCCCCC')
-        canvas.setStrokeColor(colors.HexColor(line_color))
-        canvas.setLineWidth(0.5)
-        canvas.line(
-            0.75 * inch,
-            footer_y + 0.2 * inch,
-            page_width - 0.75 * inch,
-            footer_y + 0.2 * inch
+    line_color = _hex(get('line_color', '#CCCCCC')) if get('draw_line', False) else None
+    line_y = footer_y + 0.2 * inch
+
+    def draw(canvas, total_pages=None):
+        if isolated:
+            canvas.saveState()
+
+        canvas.setFont("Helvetica", font_size)
+        canvas.setFillColor(text_color)
+
+        current_page = canvas.getPageNumber()
+        page_zones = dict(zones)
+        page_zones[page_num_position] = page_num_format.format(
+            n=current_page,
+            total=current_page if total_pages is None else total_pages
         )
-    
-    canvas.restoreState()
 
+        # Draw each zone
+        if page_zones['left']:
+            canvas.drawString(left_x, footer_y, str(page_zones['left']))
+        if page_zones['center']:
+            canvas.drawCentredString(center_x, footer_y, str(page_zones['center']))
+        if page_zones['right']:
+            canvas.drawRightString(right_x, footer_y, str(page_zones['right']))
 
-def draw_header(canvas, doc, header_config):
-    """Draw header with optional logo and text"""
-    canvas.saveState()
-    
+        if line_color is not None:
+            canvas.setStrokeColor(line_color)
+            canvas.setLineWidth(0.5)
+            canvas.line(left_x, line_y, right_x, line_y)
+
+        if isolated:
+            canvas.restoreState()
+
+    return draw
+
+
+def draw_footer(canvas, doc, footer_config, total_pages=None):
+    """Draw three-zone footer with flexible positioning"""
+    if total_pages is None:
+        total_pages = getattr(doc, '_total_page_count', None)
+    _footer_drawer(footer_config)(canvas, total_pages)
+
+
+def _header_drawer(header_config):
+    """
+    Resolve a header config once per document; returns draw(canvas) that only
+    paints the logo, text and line on each page.
+    """
+    get = header_config.get
     page_width = letter[0]
     page_height = letter[1]
-    header_height = header_config.get('height', 0.75) * inch
+    header_height = get('height', 0.75) * inch
     header_y = page_height - 0.5 * inch
-    
-    font_size = header_config.get('font_size', 10)
-    text_color = header_config.get('text_color', '#333333')
-    
-    # Draw logo if provided
-    logo_path = header_config.get('logo_path')
-    if logo_path and os.path.exists(logo_path):
-        logo_width = header_config.get('logo_width', 1.0) * inch
-        logo_height = header_config.get('logo_height', 0.4) * inch
-        logo_position = header_config.get('logo_position', 'left')
-        
-        # Calculate logo X position
-        if logo_position == 'left':
-            logo_x = 0.75 * inch
-        elif logo_position == 'center':
-            logo_x = (page_width - logo_width) / 2.0
-        else:  # right
-            logo_x = page_width - 0.75 * inch - logo_width
-        
-        logo_y = header_y - logo_height
-        
-        try:
-            canvas.drawImage(logo_path, logo_x, logo_y, 
-                           width=logo_width, height=logo_height, 
-                           preserveAspectRatio=True, mask='auto')
-        except Exception as e:
-            print(f"⚠️ Warning: Could not load logo '{logo_path}': {e}")
-    
-    # Draw header text if provided
-    header_text = header_config.get('text')
-    if header_text:
-        text_position = header_config.get('text_position', 'right')
-        canvas.setFont("Helvetica", font_size)
-        canvas.setFillColor(colors.HexColor(text_color))
-        
-        text_y = header_y - 0.3 * inch
-        
-        if text_position == 'left':
-            canvas.drawString(0.75 * inch, text_y, str(header_text))
-        elif text_position == 'center':
-            canvas.drawCentredString(page_width / 2.0, text_y, str(header_text))
-        else:  # right
-            canvas.drawRightString(page_width - 0.75 * inch, text_y, str(header_text))
-    
+
+    font_size = get('font_size', 10)
+    text_color = _hex(get('text_color', '#333333'))
+
+    # Logo placement (checked for existence once, not per page)
+    logo_path = get('logo_path')
+    if not (logo_path and os.path.exists(logo_path)):
+        logo_path = None
+    logo_width = get('logo_width', 1.0) * inch
+    logo_height = get('logo_height', 0.4) * inch
+    logo_position = get('logo_position', 'left')
+    if logo_position == 'left':
+        logo_x = 0.75 * inch
+    elif logo_position == 'center':
+        logo_x = (page_width - logo_width) / 2.0
+    else:  # right
+        logo_x = page_width - 0.75 * inch - logo_width
+    logo_y = header_y - logo_height
+
+    # Header text and where it goes
+    header_text = get('text')
+    header_text = str(header_text) if header_text else None
+    text_position = get('text_position', 'right')
+    text_y = header_y - 0.3 * inch
+
     # Optional separator line below header
-    if header_config.get('draw_line', True):
-        line_color = header_config.get('line_color', '#CCCCCC')
-        canvas.setStrokeColor(colors.HexColor(line_color))
-        canvas.setLineWidth(0.5)
-        line_y = header_y - header_height + 0.2 * inch
-        canvas.line(
-            0.75 * inch,
-            line_y,
-            page_width - 0.75 * inch,
-            line_y
-        )
-    
-    canvas.restoreState()
+    line_color = _hex(get('line_color', '#CCCCCC')) if get('draw_line', True) else None
+    line_y = header_y - header_height + 0.2 * inch
+
+    def draw(canvas):
+        canvas.saveState()
+
+        if logo_path:
+            try:
+                canvas.drawImage(logo_path, logo_x, logo_y,
+                               width=logo_width, height=logo_height,
+                               preserveAspectRatio=True, mask='auto')
+            except Exception as e:
+                print(f"⚠️ Warning: Could not load logo '{logo_path}': {e}")
+
+        if header_text:
+            canvas.setFont("Helvetica", font_size)
+            canvas.setFillColor(text_color)
+            if text_position == 'left':
+                canvas.drawString(0.75 * inch, text_y, header_text)
+            elif text_position == 'center':
+                canvas.drawCentredString(page_width / 2.0, text_y, header_text)
+            else:  # right
+                canvas.drawRightString(page_width - 0.75 * inch, text_y, header_text)
+
+        if line_color is not None:
+            canvas.setStrokeColor(line_color)
+            canvas.setLineWidth(0.5)
+            canvas.line(0.75 * inch, line_y, page_width - 0.75 * inch, line_y)
+
+        canvas.restoreState()
+
+    return draw
+
+
+def draw_header(canvas, doc, header_config):
+    """Draw header with optional logo and text"""
+    _header_drawer(header_config)(canvas)
 
 
 def create_header_footer_callback(header_config, footer_config, background_drawing=None):
@@ -153,104 +199,235 @@ def create_header_footer_callback(header_config, footer_config, background_drawi
         footer_config: Footer configuration dict
         background_drawing: Optional ReportLab Drawing object (from load_and_scale_svg)
     """
+    header_drawer = _header_drawer(header_config) if header_config else None
+    footer_drawer = _footer_drawer(footer_config) if footer_config else None
+
     def on_page(canvas, doc):
         """Called for each page - draws background, header and footer"""
-        canvas.saveState()
+        # No outer saveState: renderPDF.draw and the header/footer
+        # drawers each save/restore the graphics state themselves
         
         # *** DRAW BACKGROUND FIRST (if provided) ***
         if background_drawing:
             # Center the drawing on page
-            from reportlab.graphics import renderPDF
             x = (letter[0] - background_drawing.width) / 2
             y = (letter[1] - background_drawing.height) / 2
             renderPDF.draw(background_drawing, canvas, x, y)
         
         # Draw header if configured
-        if header_config:
-            draw_header(canvas, doc, header_config)
+        if header_drawer:
+            header_drawer(canvas)
         
         # Draw footer (always present with at least page numbers)
-        if footer_config:
-            draw_footer(canvas, doc, footer_config)
-        
-        canvas.restoreState()
+        if footer_drawer:
+            footer_drawer(canvas, getattr(doc, '_total_page_count', None))
     
     return on_page
 
 
-class ConditionalPageBreak(Flowable):
+class NumberedCanvas(Canvas):
     """
-    A flowable that forces a page break only if remaining space is below threshold.
-    Checks available height at render time (during wrap), not at story-building time.
+    Canvas that holds finished pages until save(), then draws each footer
+    with the real page total. Replaces the old count-pages-then-rebuild pass.
     """
-    
-    def __init__(self, threshold_inches=2.0):
-        """
-        Args:
-            threshold_inches: Minimum space needed to continue on current page
-        """
-        Flowable.__init__(self)
-        self.threshold = threshold_inches * inch
-        self.width = 0
-        self.height = 0
-    
-    def wrap(self, availWidth, availHeight):
+
+    def __init__(self, *args, footer_config=None, **kwargs):
+        Canvas.__init__(self, *args, **kwargs)
+        # Footer config is resolved once here, not on every page
+        # Footer is the last thing on each page, so it needs no state isolation
+        self._draw_footer = _footer_drawer(footer_config, isolated=False) if footer_config else None
+        self._saved_page_states = []
+
+    def showPage(self):
+        self._saved_page_states.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        total_pages = len(self._saved_page_states)
+        for state in self._saved_page_states:
+            self.__dict__.update(state)
+            if self._draw_footer:
+                self._draw_footer(self, total_pages)
+            Canvas.showPage(self)
+        Canvas.save(self)
+
+
+class StreamingDocTemplate(BaseDocTemplate):
+    """
+    BaseDocTemplate that lays out a report one section story at a time, so
+    placed flowables - and the section data behind them - can be freed before
+    later sections render. Layout is still done by BaseDocTemplate.build; the
+    queue it drains is topped up from the story iterator in filterFlowables,
+    the public hook build runs before each flowable is handled.
+
+    This relies on build() draining the list it was given in place (as
+    ReportLab 4.x/5.0 do) rather than a copy: filterFlowables only tops up
+    that same list object. build_stream raises if build() returns with
+    stories still unqueued, instead of silently dropping later sections.
+    """
+
+    _stories = _queue = None
+
+    def build_stream(self, stories, canvasmaker=Canvas):
+        self._stories = iter(stories)
+        flowables = self._queue = []
+        first = self._queued = self._top_up(flowables)
+        progress = self._onProgress
+        if progress:
+            # build() sizes PROGRESS against the first batch only
+            self._onProgress = lambda typ, value: progress(
+                typ, value + self._queued - first if typ == 'PROGRESS' else value)
+        try:
+            self.build(flowables, canvasmaker=canvasmaker)
+            if self._stories is not None:
+                raise RuntimeError("BaseDocTemplate.build stopped before every section was laid out; "
+                                   "it no longer drains the list passed to it")
+        finally:
+            self._stories = self._queue = None
+            self._onProgress = progress
+
+    def filterFlowables(self, flowables):
+        if flowables is not self._queue:  # e.g. clean_hanging's page-begin list
+            return
+        added = self._top_up(flowables)
+        if added:
+            self._queued += added
+            if self._onProgress:
+                self._onProgress('SIZE_EST', self._queued)
+
+    def _top_up(self, flowables):
         """
-        Check available height and decide whether to force page break.
-        
-        This is called at render time, so availHeight is accurate.
-        If availHeight < threshold, we return dimensions that exceed available space,
-        forcing ReportLab to move to the next page.
+        Queue more stories while build() could run dry: it stops on an empty
+        list, and a trailing keepWithNext flowable must see what follows it.
+        Returns the number of flowables added.
         """
-        if availHeight < self.threshold:
-            # Force page break by requesting more height than available
-            # This causes ReportLab to move this (and following content) to next page
-            return (availWidth, availHeight + 1)
-        else:
-            # Don't force break - take no space
-            return (0, 0)
-    
-    def draw(self):
-        """Nothing to draw - this is just a conditional spacer"""
-        pass
+        added = 0
+        while self._stories is not None and (len(flowables) < 2 or flowables[-1].getKeepWithNext()):
+            story = next(self._stories, None)
+            if story is None:
+                self._stories = None
+                break
+            flowables.extend(story)
+            added += len(story)
+        return added
+
+
+# Titles/headers start a new page when less than this much room is left
+# (prevents orphaned titles at the bottom of a page)
+_ORPHAN_GUARD_HEIGHT = 2.0 * inch
+
+
+# ==================== PARAGRAPH STYLES ====================
+# Built once at import and shared by every render call (styles are read-only
+# once attached to a Paragraph).
+
+_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Title'],
+    fontSize=18,
+    textColor=colors.black,
+    alignment=TA_CENTER,
+    spaceAfter=6
+)
+
+_SECTION_TITLE_STYLE = ParagraphStyle(
+    'SectionTitle',
+    parent=_STYLES['Heading2'],
+    fontSize=14,
+    spaceAfter=10
+)
+
+# Table/grouped titles stay with the table that follows
+_TABLE_TITLE_STYLE = ParagraphStyle(
+    'TableTitle',
+    parent=_SECTION_TITLE_STYLE,
+    keepWithNext=True
+)
+
+_CATEGORY_HEADER_STYLE = ParagraphStyle(
+    'CategoryHeader',
+    parent=_STYLES['Heading2'],
+    fontSize=12,
+    textColor=_hex('#333333'),
+    spaceAfter=6,
+    keepWithNext=True
+)
+
+_CAPTION_STYLE = ParagraphStyle(
+    'Caption',
+    parent=_STYLES['Normal'],
+    fontSize=10,
+    fontName='Helvetica-Oblique'
+)
+
+# Table cell styles (Paragraph cells enable text wrapping)
+_CELL_STYLE = ParagraphStyle(
+    'TableCell',
+    parent=_STYLES['Normal'],
+    fontSize=10,
+    leading=12
+)
+
+_CELL_STYLE_BOLD = ParagraphStyle(
+    'TableCellBold',
+    parent=_CELL_STYLE,
+    fontName='Helvetica-Bold'
+)
+
+_HEADER_STYLE = ParagraphStyle(
+    'TableHeader',
+    parent=_STYLES['Normal'],
+    fontSize=11,
+    fontName='Helvetica-Bold',
+    leading=13
+)
+
+# Styles whose text color comes from the theme / section config
+_THEMED_STYLE_ARGS = {
+    'CustomSubtitle': dict(parent=_STYLES['Normal'], fontSize=14, alignment=TA_CENTER, spaceAfter=20),
+    'SectionSubtitle': dict(parent=_STYLES['Normal'], fontSize=12, fontName='Helvetica-Oblique', spaceAfter=10),
+    'TableSubtitle': dict(parent=_STYLES['Normal'], fontSize=12, fontName='Helvetica-Oblique', spaceAfter=10,
+                          keepWithNext=True),
+}
+
+@lru_cache(maxsize=64)
+def _themed_style(name, color_hex):
+    """One ParagraphStyle per (style name, color) for the whole process"""
+    return ParagraphStyle(name, textColor=_hex(color_hex), **_THEMED_STYLE_ARGS[name])
+
+@lru_cache(maxsize=64)
+def _text_style(font_size, font_name, alignment):
+    """Body style for text sections, keyed on the few knobs a section can set"""
+    return ParagraphStyle(
+        'CustomPara',
+        parent=_STYLES['Normal'],
+        fontSize=font_size,
+        fontName=font_name,
+        alignment=alignment
+    )
 
 
 # ==================== BASIC RENDERING FUNCTIONS ====================
 
 def render_pdf_title(story, section_config, styles, available_width, theme):
     """Render title section in PDF"""
-    from reportlab.graphics.shapes import Drawing, Line
-
     title = section_config.get('title', '')
     subtitle = section_config.get('subtitle', '')
 
     if title:
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Title'],
-            fontSize=18,
-            textColor=colors.black,
-            alignment=TA_CENTER,
-            spaceAfter=6
-        )
-        story.append(Paragraph(title, title_style))
+        story.append(Paragraph(title, _TITLE_STYLE))
 
     if subtitle:
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Normal'],
-            fontSize=14,
-            textColor=colors.HexColor(section_config.get('subtitle_color', theme['subtitle'])),
-            alignment=TA_CENTER,
-            spaceAfter=20
-        )
-        story.append(Paragraph(subtitle, subtitle_style))
+        subtitle_color = section_config.get('subtitle_color', theme['subtitle'])
+        story.append(Paragraph(subtitle, _themed_style('CustomSubtitle', subtitle_color)))
 
     # Add separator line
     separator_color = section_config.get('separator_color', theme['separator'])
     d = Drawing(available_width, 1)
     line = Line(0, 0, available_width, 0)
-    line.strokeColor = colors.HexColor(separator_color)
+    line.strokeColor = _hex(separator_color)
     line.strokeWidth = 2
     d.add(line)
     story.append(d)
@@ -264,25 +441,11 @@ def render_pdf_text(story, section_config, styles, theme):
 
     title = section_config.get('title')
     if title:
-        section_title_style = ParagraphStyle(
-            'SectionTitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=10
-        )
-        story.append(Paragraph(title, section_title_style))
+        story.append(Paragraph(title, _SECTION_TITLE_STYLE))
 
     subtitle = section_config.get('subtitle')
     if subtitle:
-        subtitle_style = ParagraphStyle(
-            'SectionSubtitle',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor(theme['section_subtitle']),
-            fontName='Helvetica-Oblique',
-            spaceAfter=10
-        )
-        story.append(Paragraph(subtitle, subtitle_style))
+        story.append(Paragraph(subtitle, _themed_style('SectionSubtitle', theme['section_subtitle'])))
 
     style_name = section_config.get('style', 'normal')
     font_name = 'Helvetica'
@@ -294,22 +457,31 @@ def render_pdf_text(story, section_config, styles, theme):
     alignment = TA_CENTER if section_config.get('alignment') == 'center' else 0
     font_size = section_config.get('font_size', 11)
 
-    para_style = ParagraphStyle(
-        'CustomPara',
-        parent=styles['Normal'],
-        fontSize=font_size,
-        fontName=font_name,
-        alignment=alignment
-    )
-
-    story.append(Paragraph(content, para_style))
+    story.append(Paragraph(content, _text_style(font_size, font_name, alignment)))
     story.append(Spacer(1, 0.2*inch))
 
+# Plain string cells get _CELL_STYLE's font via a FONT table command, so they
+# look the same as one-line Paragraph cells.
+_CELL_H_PADDING = 12  # default left + right cell padding
+_NEEDS_PARAGRAPH = re.compile(r'[<>&\n\r\t]|^\s|\s$|\s\s')  # markup or whitespace Paragraph rewrites
+
+def _fits_as_plain_text(values, width):
+    """True if every value is markup-free and fits on one line (measured in bold)"""
+    for v in values:
+        if _NEEDS_PARAGRAPH.search(v) or stringWidth(v, _CELL_STYLE_BOLD.fontName, _CELL_STYLE_BOLD.fontSize) > width:
+            return False
+    return True
+
+@lru_cache(maxsize=256)
+def _image_size(image_path, mtime):
+    """(width, height) in pixels, read from the image header once per (path, mtime)"""
+    from PIL import Image as PILImage  # lazy: only reports with image sections need PIL
+
+    with PILImage.open(image_path) as img:
+        return img.size
+
 def render_pdf_image(story, section_config, available_width, theme):
     """Render image section in PDF"""
-    from reportlab.platypus import Image, KeepTogether, PageBreak
-    from PIL import Image as PILImage
-
     image_path = section_config.get('image_path', '')
     if not image_path or not os.path.exists(image_path):
         return
@@ -318,47 +490,30 @@ def render_pdf_image(story, section_config, available_width, theme):
     # (prevents orphaned titles at bottom of page)
     title = section_config.get('title')
     if title:
-        story.append(ConditionalPageBreak(threshold_inches=2.0))
+        story.append(CondPageBreak(_ORPHAN_GUARD_HEIGHT))
 
     # Collect all elements to keep together
     elements = []
     
     title = section_config.get('title')
     if title:
-        elements.append(Paragraph(title, getSampleStyleSheet()['Heading2']))
+        elements.append(Paragraph(title, _STYLES['Heading2']))
 
     subtitle = section_config.get('subtitle')
     if subtitle:
-        styles = getSampleStyleSheet()
-        subtitle_style = ParagraphStyle(
-            'SectionSubtitle',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor(theme['section_subtitle']),
-            fontName='Helvetica-Oblique',
-            spaceAfter=10
-        )
-        elements.append(Paragraph(subtitle, subtitle_style))
+        elements.append(Paragraph(subtitle, _themed_style('SectionSubtitle', theme['section_subtitle'])))
 
     caption = section_config.get('caption')
     if caption:
-        styles = getSampleStyleSheet()
-        caption_style = ParagraphStyle(
-            'Caption',
-            parent=styles['Normal'],
-            fontSize=10,
-            fontName='Helvetica-Oblique'
-        )
-        elements.append(Paragraph(caption, caption_style))
+        elements.append(Paragraph(caption, _CAPTION_STYLE))
 
     width_inches = section_config.get('width', 6)
     target_width = width_inches * inch
     
     # Calculate height based on image aspect ratio
-    with PILImage.open(image_path) as img:
-        img_width, img_height = img.size
-        aspect_ratio = img_height / img_width
-        target_height = target_width * aspect_ratio
+    img_width, img_height = _image_size(os.path.abspath(image_path), os.path.getmtime(image_path))
+    aspect_ratio = img_height / img_width
+    target_height = target_width * aspect_ratio
     
     elements.append(Image(image_path, width=target_width, height=target_height))
     
@@ -370,73 +525,37 @@ def render_pdf_image(story, section_config, available_width, theme):
 print("✅ C04: Header/footer functions loaded (BaseDocTemplate ready)")
 
 
-def render_pdf_table(story, section_config, available_width, styles, theme):
-    """Render table section in PDF"""
-    from reportlab.platypus import PageBreak
-    from reportlab.lib import colors as rl_colors
-    
-    df = section_config['df']
-    if len(df) == 0:
-        return
-
-    df_work = df.copy()
-
-    if section_config.get('clean_empty_cols'):
-        df_work = df_work.dropna(axis=1, how='all')
-        df_work = df_work.loc[:, (df_work != '').any(axis=0)]
-
-    if section_config.get('clean_empty_rows'):
-        df_work = df_work.dropna(axis=0, how='all')
-        df_work = df_work[(df_work.astype(str) != '').any(axis=1)]
-
-    if 'drop_columns' in section_config:
-        drop_cols = section_config['drop_columns']
-        df_work = df_work.drop(columns=[c for c in drop_cols if c in df_work.columns])
-
-    if len(df_work) == 0:
-        return
-
-    df_work = prepare_dataframe(df_work)
-
-    title = section_config.get('title', '')
-    
-    # Check if we should force page break before title (prevents orphaning)
-    if title:
-        story.append(ConditionalPageBreak(threshold_inches=2.0))
-    if 'title_suffix_from_column' in section_config:
-        col = section_config['title_suffix_from_column']
-        if col in df.columns:
-            val = df[col].iloc[0]
-            title = f"{title} ({val})"
-
-    if title:
-        section_title_style = ParagraphStyle(
-            'SectionTitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=10,
-            keepWithNext=True  # Keep title with next element (table)
-        )
-        story.append(Paragraph(title, section_title_style))
-
-    subtitle = section_config.get('subtitle')
-    if subtitle:
-        subtitle_style = ParagraphStyle(
-            'SectionSubtitle',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor(theme['section_subtitle']),
-            fontName='Helvetica-Oblique',
-            spaceAfter=10,
-            keepWithNext=True  # Keep subtitle with next element (table)
-        )
-        story.append(Paragraph(subtitle, subtitle_style))
-
-    section_colors = section_config.get('colors', theme)
+def _table_style_commands(section_colors):
+    """TableStyle commands that depend only on the section colors (shared by grouped tables)"""
+    return [
+        ('BACKGROUND', (0, 0), (-1, 0), _hex(section_colors['header_bg'])),
+        ('TEXTCOLOR', (0, 0), (-1, 0), _hex(section_colors['header_text'])),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        # Body font for plain-string cells, kept in step with _CELL_STYLE
+        ('FONT', (0, 1), (-1, -1), _CELL_STYLE.fontName, _CELL_STYLE.fontSize, _CELL_STYLE.leading),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        #('WORDWRAP', (0, 0), (-1, -1), True),
+        # Alternating row colors (even table rows; odd rows keep the page background)
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [None, _hex(section_colors['row_alt'])]),
+    ]
 
-    # Evaluate formatting rules if provided
-    formatting_rules = section_config.get('formatting_rules', [])
-    style_map = evaluate_formatting_rules(df_work, formatting_rules)
+def _build_pdf_table(df_work, section_config, available_width, style_commands):
+    """
+    Table for an already selected + prepared frame: formatting rules,
+    column/cell formats and column widths from section_config, on top of
+    the section's shared style_commands.
+    """
+    # Evaluate formatting rules if provided (most tables have none)
+    formatting_rules = section_config.get('formatting_rules')
+    if formatting_rules:
+        style_map = evaluate_formatting_rules(
+            df_work, formatting_rules, max_workers=section_config.get('formatting_rules_workers'))
+    else:
+        style_map = {'rows': {}, 'cells': {}, 'warnings': []}
 
     # Get column and cell format specifications (Phase 5.1)
     column_formats = section_config.get('column_formats', {})
@@ -448,63 +567,19 @@ def render_pdf_table(story, section_config, available_width, styles, theme):
         for warning in style_map['warnings']:
             print(f"   • {warning}")
 
-    # Create paragraph style for table cells (enables text wrapping)
-    cell_style = ParagraphStyle(
-        'TableCell',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=12
-    )
+    # Format column-wise: each column's spec is compiled once into a
+    # formatter (prebuilt str.format for numeric columns), and
+    # cell_formats (priority over column_formats) patch individual cells
+    n_rows = len(df_work)
+    formatted = [_compile_formatter(column_formats.get(col), dtype)(df_work.iloc[:, j])
+                 for j, (col, dtype) in enumerate(df_work.dtypes.items())]
+    for (row_idx, col_idx), spec in cell_formats.items():
+        if spec and 1 <= row_idx <= n_rows and 0 <= col_idx < len(formatted):  # row 0 is the header
+            formatted[col_idx][row_idx - 1] = format_value(df_work.iat[row_idx - 1, col_idx], spec)
 
-    cell_style_bold = ParagraphStyle(
-        'TableCellBold',
-        parent=styles['Normal'],
-        fontSize=10,
-        leading=12,
-        fontName='Helvetica-Bold'
-    )
-
-    header_style = ParagraphStyle(
-        'TableHeader',
-        parent=styles['Normal'],
-        fontSize=11,
-        fontName='Helvetica-Bold',
-        leading=13
-    )
-
-    # Wrap all cell content in Paragraphs for auto-wrapping
-    table_data = [[Paragraph(str(col), header_style) for col in df_work.columns]]
-    for row_idx, (_, row) in enumerate(df_work.iterrows()):
-        # Check if entire row should be bold
-        row_style = style_map['rows'].get(row_idx, {})
-        use_bold = row_style.get('bold', False)
-
-        row_cells = []
-        for col_idx, value in enumerate(row):
-            # Check for cell-specific styling
-            cell_key = (row_idx + 1, col_idx)  # +1 for header row
-            cell_specific_style = style_map['cells'].get(cell_key, {})
-
-            # Get format specification (Phase 5.1)
-            # Priority: cell_formats > column_formats
-            format_spec = cell_formats.get(cell_key)
-            if not format_spec:
-                col_name = df_work.columns[col_idx]
-                format_spec = column_formats.get(col_name)
-
-            # Format the value
-            formatted_value = format_value(value, format_spec)
-
-            # Determine which base style to use
-            if use_bold or cell_specific_style.get('bold', False):
-                base_style = cell_style_bold
-            else:
-                base_style = cell_style
-
-            # Text color not supported per documentation - only bg_color and bold
-            row_cells.append(Paragraph(formatted_value, base_style))
-
-        table_data.append(row_cells)
+    # Bold lookups as sets (style_map rows are 0-based, cells use table coordinates)
+    bold_rows = {r for r, st in style_map['rows'].items() if st.get('bold')}
+    bold_cells = {key for key, st in style_map['cells'].items() if st.get('bold')}
 
     col_widths = None
     if 'column_widths' in section_config:
@@ -515,48 +590,91 @@ def render_pdf_table(story, section_config, available_width, styles, theme):
     if col_widths is None:
         col_widths = [available_width / len(df_work.columns)] * len(df_work.columns)
 
+    # Columns whose every value fits on one line without markup are passed to
+    # Table as plain strings; only the rest pay for Paragraph parsing/wrapping
+    plain_cols = [_fits_as_plain_text(values, width - _CELL_H_PADDING)
+                  for values, width in zip(formatted, col_widths)]
+
+    # Wrap remaining cell content in Paragraphs for auto-wrapping
+    # Text color not supported per documentation - only bg_color and bold
+    table_data = [[Paragraph(str(col), _HEADER_STYLE) for col in df_work.columns]]
+    for row_idx, row in enumerate(zip(*formatted)):
+        r = row_idx + 1  # +1 for header row
+        bold_row = row_idx in bold_rows
+        table_data.append([
+            v if plain_cols[c] else
+            Paragraph(v, _CELL_STYLE_BOLD if bold_row or (r, c) in bold_cells else _CELL_STYLE)
+            for c, v in enumerate(row)
+        ])
+
     table = Table(table_data, colWidths=col_widths, repeatRows=1)
 
-    style_list = [
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(section_colors['header_bg'])),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor(section_colors['header_text'])),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONT SIZE', (0, 1), (-1, -1), 11),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        #('WORDWRAP', (0, 0), (-1, -1), True),
-    ]
+    style_list = list(style_commands)
 
-    # Apply alternating row colors to all rows
-    for i in range(1, len(table_data)):
-        if i % 2 == 0:
-            style_list.append(('BACKGROUND', (0, i), (-1, i), colors.HexColor(section_colors['row_alt'])))
+    # Bold for plain-string cells (Paragraph cells carry it in their style)
+    if any(plain_cols):
+        for row_idx in bold_rows:
+            style_list.append(('FONTNAME', (0, row_idx + 1), (-1, row_idx + 1), 'Helvetica-Bold'))
+        for row_idx, col_idx in bold_cells:
+            style_list.append(('FONTNAME', (col_idx, row_idx), (col_idx, row_idx), 'Helvetica-Bold'))
 
     # Apply row-level formatting (overrides alternating colors)
     for row_idx, row_style in style_map['rows'].items():
         actual_row = row_idx + 1  # +1 for header
         if 'bg_color' in row_style:
-            style_list.append(('BACKGROUND', (0, actual_row), (-1, actual_row), colors.HexColor(row_style['bg_color'])))
+            style_list.append(('BACKGROUND', (0, actual_row), (-1, actual_row), _hex(row_style['bg_color'])))
 
     # Apply cell-level formatting (no text color support per documentation)
     for (row_idx, col_idx), cell_style_data in style_map['cells'].items():
         if 'bg_color' in cell_style_data:
-            style_list.append(('BACKGROUND', (col_idx, row_idx), (col_idx, row_idx), colors.HexColor(cell_style_data['bg_color'])))
+            style_list.append(('BACKGROUND', (col_idx, row_idx), (col_idx, row_idx), _hex(cell_style_data['bg_color'])))
 
     table.setStyle(TableStyle(style_list))
+    return table
+
+def render_pdf_table(story, section_config, available_width, styles, theme):
+    """Render table section in PDF"""
+    df = section_config['df']
+    if len(df) == 0:
+        return
+
+    # clean_empty_cols/rows + drop_columns as one selection (no full-frame copy)
+    df_work = _select_table_frame(df, section_config)
+
+    if len(df_work) == 0:
+        return
+
+    df_work = prepare_dataframe(df_work)
+
+    title = section_config.get('title', '')
+    
+    # Check if we should force page break before title (prevents orphaning)
+    if title:
+        story.append(CondPageBreak(_ORPHAN_GUARD_HEIGHT))
+    if 'title_suffix_from_column' in section_config:
+        col = section_config['title_suffix_from_column']
+        if col in df.columns:
+            val = df[col].iloc[0]
+            title = f"{title} ({val})"
+
+    if title:
+        # keepWithNext: title and subtitle stay with the table
+        story.append(Paragraph(title, _TABLE_TITLE_STYLE))
+
+    subtitle = section_config.get('subtitle')
+    if subtitle:
+        story.append(Paragraph(subtitle, _themed_style('TableSubtitle', theme['section_subtitle'])))
+
+    section_colors = section_config.get('colors', theme)
 
     # Add table normally (can break across pages naturally)
     # keepWithNext on title/subtitle ensures they stay with table start
-    story.append(table)
+    story.append(_build_pdf_table(df_work, section_config, available_width,
+                                  _table_style_commands(section_colors)))
     story.append(Spacer(1, 0.3*inch))
 
 def render_pdf_table_grouped(story, section_config, available_width, styles, theme):
     """Render grouped tables to PDF using regular table rendering for each group"""
-    from reportlab.platypus import KeepTogether, PageBreak
-    
     df = section_config['df']
     groupby_col = section_config['groupby']
     
@@ -578,12 +696,22 @@ def render_pdf_table_grouped(story, section_config, available_width, styles, the
         category_order = sorted(df[groupby_col].unique())
     drop_columns = section_config.get('drop_columns', [])
     
+    # Shared by every group table: style commands + formatting configs
+    # (Phase 5.2 - same rules/formats as a regular table)
     section_colors = section_config.get('colors', theme)
-    
-    # Extract formatting configs (Phase 5.2 - pass through to regular table)
-    formatting_rules = section_config.get('formatting_rules', [])
-    column_formats = section_config.get('column_formats', {})
-    cell_formats = section_config.get('cell_formats', {})
+    style_commands = _table_style_commands(section_colors)
+    group_table_config = {
+        'formatting_rules': section_config.get('formatting_rules', []),
+        'formatting_rules_workers': section_config.get('formatting_rules_workers'),
+        'column_formats': section_config.get('column_formats', {}),
+        'cell_formats': section_config.get('cell_formats', {}),
+    }
+    # Only add column_widths if explicitly provided
+    if section_config.get('column_widths') is not None:
+        group_table_config['column_widths'] = section_config['column_widths']
+
+    # One groupby pass instead of a boolean scan of df per category
+    groups = dict(iter(df.groupby(groupby_col, sort=False, observed=True)))
     
     # Render section-level title if provided
     section_title = section_config.get('title')
@@ -591,49 +719,23 @@ def render_pdf_table_grouped(story, section_config, available_width, styles, the
     
     # Check if we should force page break before section title (prevents orphaning)
     if section_title:
-        story.append(ConditionalPageBreak(threshold_inches=2.0))
+        story.append(CondPageBreak(_ORPHAN_GUARD_HEIGHT))
     
     group_elements = []
     
     if section_title:
-        title_style = ParagraphStyle(
-            'GroupedTableTitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=10,
-            keepWithNext=True
-        )
-        group_elements.append(Paragraph(section_title, title_style))
+        group_elements.append(Paragraph(section_title, _TABLE_TITLE_STYLE))
     
     if section_subtitle:
-        subtitle_style = ParagraphStyle(
-            'GroupedTableSubtitle',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor(theme['section_subtitle']),
-            fontName='Helvetica-Oblique',
-            spaceAfter=10,
-            keepWithNext=True
-        )
-        group_elements.append(Paragraph(section_subtitle, subtitle_style))
-    
-    # Create section title style for group headers
-    category_header_style = ParagraphStyle(
-        'CategoryHeader',
-        parent=styles['Heading2'],
-        fontSize=12,
-        textColor=colors.HexColor('#333333'),
-        spaceAfter=6,
-        keepWithNext=True
-    )
+        group_elements.append(Paragraph(section_subtitle, _themed_style('TableSubtitle', theme['section_subtitle'])))
     
     # Process each category
     first_group = True
     for category in category_order:
-        category_df = df[df[groupby_col] == category].copy()
+        category_df = groups.get(category)
         
         # Skip if empty
-        if category_df.empty:
+        if category_df is None or category_df.empty:
             continue
         
         # Clean columns
@@ -655,30 +757,16 @@ def render_pdf_table_grouped(story, section_config, available_width, styles, the
         
         # Check if we should force page break before category header (prevents orphaning)
         if not first_group:
-            current_group_elements.append(ConditionalPageBreak(threshold_inches=2.0))
+            current_group_elements.append(CondPageBreak(_ORPHAN_GUARD_HEIGHT))
         
-        current_group_elements.append(Paragraph(str(category), category_header_style))
+        current_group_elements.append(Paragraph(str(category), _CATEGORY_HEADER_STYLE))
         current_group_elements.append(Spacer(1, 6))
         
-        # Create a temporary story to capture table output
-        temp_story = []
-        
-        # Create a sub-section config for this group and call regular table renderer
-        group_section_config = {
-            'df': category_df,
-            'colors': section_colors,
-            'formatting_rules': formatting_rules,
-            'column_formats': column_formats,
-            'cell_formats': cell_formats
-        }
-        
-        # Only add column_widths if explicitly provided
-        if 'column_widths' in section_config and section_config['column_widths'] is not None:
-            group_section_config['column_widths'] = section_config['column_widths']
-        
-        # Call regular table renderer
-        render_pdf_table(temp_story, group_section_config, available_width, styles, theme)
-        current_group_elements.extend(temp_story)
+        # Same table as render_pdf_table, minus its per-call setup
+        category_df = prepare_dataframe(category_df)
+        current_group_elements.append(
+            _build_pdf_table(category_df, group_table_config, available_width, style_commands))
+        current_group_elements.append(Spacer(1, 0.3*inch))
         
         # For first group, add to group_elements to keep with section title
         if first_group:
@@ -696,6 +784,27 @@ def render_pdf_table_grouped(story, section_config, available_width, styles, the
         story.extend(group_elements)
 
 
+_BACKGROUND_FORM = 'reportBackground'
+
+
+@lru_cache(maxsize=8)
+def _cached_background_svg(svg_path, mtime, size):
+    """Parse + scale an SVG once per (path, mtime, size)"""
+    return load_and_scale_svg(svg_path)
+
+
+def _load_background_svg(svg_path):
+    """
+    Return the scaled background Drawing, reusing a previous parse when the
+    file is unchanged. The Drawing is shared, so callers must only draw it.
+    """
+    try:
+        st = os.stat(svg_path)
+    except OSError:
+        return load_and_scale_svg(svg_path)  # reports the missing file
+    return _cached_background_svg(os.path.abspath(svg_path), st.st_mtime_ns, st.st_size)
+
+
 def _generate_pdf_report(report_sections, output_filename, theme, 
                          header_config=None, footer_config=None, background_svg=None):
     """
@@ -708,7 +817,7 @@ def _generate_pdf_report(report_sections, output_filename, theme,
     # *** LOAD BACKGROUND ONCE (before creating doc) ***
     background_drawing = None
     if background_svg:
-        background_drawing = load_and_scale_svg(background_svg)
+        background_drawing = _load_background_svg(background_svg)
         if not background_drawing:
             print(f"⚠️ Warning: Could not load background SVG: {background_svg}")
     
@@ -741,8 +850,7 @@ def _generate_pdf_report(report_sections, output_filename, theme,
     footer_height = footer_config.get('height', 0.5)
     bottom_margin = (0.5 + footer_height) * inch
     
-    # STEP 1: Build document WITHOUT header/footer to count pages
-    doc_temp = BaseDocTemplate(
+    doc = StreamingDocTemplate(
         output_filename,
         pagesize=letter,
         topMargin=top_margin,
@@ -750,120 +858,86 @@ def _generate_pdf_report(report_sections, output_filename, theme,
         leftMargin=0.75*inch,
         rightMargin=0.75*inch
     )
-    
-    frame_temp = Frame(
+
+    frame = Frame(
         x1=0.75*inch,
         y1=bottom_margin,
         width=letter[0] - 1.5*inch,
         height=letter[1] - top_margin - bottom_margin,
         id='normal'
     )
-    
-    template_temp = PageTemplate(id='temp', frames=[frame_temp])
-    doc_temp.addPageTemplates([template_temp])
-    
-    # Build story
-    story = []
-    available_width = letter[0] - 1.5*inch
-    styles = getSampleStyleSheet()
-
-    for section in report_sections:
-        section_type = section['type']
-
-        if section_type == 'title':
-            render_pdf_title(story, section, styles, available_width, theme)
-        elif section_type == 'text':
-            render_pdf_text(story, section, styles, theme)
-        elif section_type == 'image':
-            render_pdf_image(story, section, available_width, theme)
-        elif section_type == 'table':
-            render_pdf_table(story, section, available_width, styles, theme)
-        elif section_type == 'table_grouped':
-            render_pdf_table_grouped(story, section, available_width, styles, theme)
-    
-    # Build temp to count pages
-    doc_temp.build(story)
-    total_page_count = doc_temp.page
-    
-    # STEP 2: Rebuild WITH header/footer using correct total
-    # Create callback with correct total (including background)
+
+    # Header config resolved once; each page only paints
+    header_drawer = _header_drawer(header_config) if header_config else None
+
     def later_pages_callback(canvas, doc):
-        """Called on each page - draws background, header/footer with correct total"""
-        canvas.saveState()
-        
-        # Inject total page count into doc for footer to use
-        doc._total_page_count = total_page_count
-        
+        """Called on each page - draws background and header (footer waits for the page total)"""
+        # No outer saveState: a Form XObject's Do restores state on its own
+        # and the header drawer saves/restores around its drawing
+
         # *** DRAW BACKGROUND FIRST (if provided) ***
+        # Rendered once into a Form XObject; later pages just reference it
         if background_drawing:
-            x = (letter[0] - background_drawing.width) / 2
-            y = (letter[1] - background_drawing.height) / 2
-            renderPDF.draw(background_drawing, canvas, x, y)
-        
+            if not canvas.hasForm(_BACKGROUND_FORM):
+                canvas.beginForm(_BACKGROUND_FORM)
+                x = (letter[0] - background_drawing.width) / 2
+                y = (letter[1] - background_drawing.height) / 2
+                renderPDF.draw(background_drawing, canvas, x, y)
+                canvas.endForm()
+            canvas.doForm(_BACKGROUND_FORM)
+
         # Draw header if configured
-        if header_config:
-            draw_header(canvas, doc, header_config)
-        
-        # Draw footer
-        if footer_config:
-            draw_footer(canvas, doc, footer_config)
-        
-        canvas.restoreState()
-    
-    # Create new document for final build
-    doc_final = BaseDocTemplate(
-        output_filename,
-        pagesize=letter,
-        topMargin=top_margin,
-        bottomMargin=bottom_margin,
-        leftMargin=0.75*inch,
-        rightMargin=0.75*inch
-    )
-    
-    frame_final = Frame(
-        x1=0.75*inch,
-        y1=bottom_margin,
-        width=letter[0] - 1.5*inch,
-        height=letter[1] - top_margin - bottom_margin,
-        id='normal'
-    )
-    
-    template_final = PageTemplate(
+        if header_drawer:
+            header_drawer(canvas)
+
+    template = PageTemplate(
         id='main',
-        frames=[frame_final],
+        frames=[frame],
         onPage=later_pages_callback
     )
-    
-    doc_final.addPageTemplates([template_final])
-    
-    # Rebuild the same story with header/footer
-    story = []
-    for section in report_sections:
-        section_type = section['type']
-
-        if section_type == 'title':
-            render_pdf_title(story, section, styles, available_width, theme)
-        elif section_type == 'text':
-            render_pdf_text(story, section, styles, theme)
-        elif section_type == 'image':
-            render_pdf_image(story, section, available_width, theme)
-        elif section_type == 'table':
-            render_pdf_table(story, section, available_width, styles, theme)
-        elif section_type == 'table_grouped':
-            render_pdf_table_grouped(story, section, available_width, styles, theme)
-    
-    # Final build with header/footer
-    doc_final.build(story)
-    
+
+    doc.addPageTemplates([template])
+
+    available_width = letter[0] - 1.5*inch
+    styles = _STYLES
+
+    def section_stories():
+        """Render sections lazily; each story is laid out before the next is built"""
+        for section in report_sections:
+            section_type = section['type']
+            story = []
+
+            if section_type == 'title':
+                render_pdf_title(story, section, styles, available_width, theme)
+            elif section_type == 'text':
+                render_pdf_text(story, section, styles, theme)
+            elif section_type == 'image':
+                render_pdf_image(story, section, available_width, theme)
+            elif section_type == 'table':
+                render_pdf_table(story, section, available_width, styles, theme)
+            elif section_type == 'table_grouped':
+                render_pdf_table_grouped(story, section, available_width, styles, theme)
+
+            yield story
+
+    # Single build: footers (with "of {total}") are drawn when the canvas is saved
+    doc.build_stream(section_stories(), canvasmaker=partial(NumberedCanvas, footer_config=footer_config))
+
     return output_filename
 
 
 # ==================== GENERIC REPORT GENERATOR ====================
 
 def generate_report(report_sections, format='pdf', output_filename='report.pdf',
-                    colors=None, header_config=None, footer_config=None, background_svg=None):
+                    colors=None, header_config=None, footer_config=None, background_svg=None,
+                    max_workers=None):
     """
     TRULY GENERIC report generator - works for any report type
+
+    background_svg is parsed once and cached per (path, mtime, size); the
+    file is treated as immutable while a report is being generated.
+    max_workers (DOCX only) renders table sections in that many worker
+    processes; see _generate_docx_report.
     """
     # Use provided colors or default to report_colors
     theme = colors if colors is not None else report_colors
@@ -881,6 +955,27 @@ def generate_report(report_sections, format='pdf', output_filename='report.pdf',
     elif format == 'docx':
         # ✅ Lazy import to avoid circular imports
         from .docx import _generate_docx_report
-        return _generate_docx_report(report_sections, output_filename, theme)
+        return _generate_docx_report(report_sections, output_filename, theme, max_workers)
     else:
         raise ValueError("format must be 'pdf' or 'docx'")
+
+
+def _generate_pdf_job(job):
+    """Worker entry point: one generate_report(format='pdf') call per job"""
+    return generate_report(**{**job, 'format': 'pdf'})
+
+def generate_pdf_reports_batch(jobs, max_workers=None):
+    """
+    Generate many independent PDF reports in parallel worker processes.
+
+    Each job is a dict of generate_report keyword arguments (report_sections,
+    output_filename, colors, header_config, footer_config, background_svg);
+    everything in it must be picklable, which DataFrames are. Returns the
+    output filenames in job order. Worker processes are torn down afterwards,
+    so ReportLab's per-process caches don't accumulate across a long batch.
+    """
+    jobs = list(jobs)
+    if max_workers == 1 or len(jobs) <= 1:
+        return [_generate_pdf_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_generate_pdf_job, jobs))
@@ -1,10 +1,17 @@
 # src/yourpkg/utils.py
+import numbers
+import operator
 import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+import numpy as np
 import pandas as pd
 
 from reportlab.lib.pagesizes import letter
-from svglib.svglib import svg2rlg
 
 # ===== Timezone used by date rules =====
 sg_tz = timezone(timedelta(hours=8))
@@ -19,6 +26,8 @@ def load_and_scale_svg(svg_path):
         print(f"⚠️ Warning: SVG background file not found: {svg_path}")
         return None
 
+    from svglib.svglib import svg2rlg  # lazy: svglib pulls in lxml/cssselect2
+
     try:
         drawing = svg2rlg(svg_path)
         if not drawing:
@@ -41,12 +50,21 @@ def load_and_scale_svg(svg_path):
         return None
 
 # ===== Color helpers =====
+# Pure functions of a hex string; the same few theme/rule colors repeat
+@lru_cache(maxsize=512)
 def hex_to_rgb(hex_color):
     hex_color = hex_color.lstrip('#')
+    if len(hex_color) == 6:
+        # one base-16 parse, channels shifted out
+        v = int(hex_color, 16)
+        return (v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 def rgb_to_hex(rgb):
-    return '#{:02x}{:02x}{:02x}'.format(int(rgb[0]), int(rgb[1]), int(rgb[2]))
+    r, g, b = int(rgb[0]), int(rgb[1]), int(rgb[2])
+    if 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255:
+        return f'#{r << 16 | g << 8 | b:06x}'
+    return '#{:02x}{:02x}{:02x}'.format(r, g, b)
 
 def interpolate_color(color1, color2, factor):
     rgb1 = hex_to_rgb(color1)
@@ -66,6 +84,31 @@ def get_gradient_color(value, min_val, mid_val, max_val, colors):
         factor = (value - mid_val) / (max_val - mid_val)
         return interpolate_color(colors[1], colors[2], factor)
 
+def _gradient_colors(values, min_val, mid_val, max_val, colors):
+    """
+    get_gradient_color over a float array in one numpy pass; returns the hex
+    strings in order. Same arithmetic as the scalar version, so same colors.
+    """
+    values = np.asarray(values, dtype='float64')
+    c0, c1, c2 = (np.array(hex_to_rgb(c), dtype='float64') for c in colors)
+    low = values <= mid_val
+    # factor per value along its half of the scale
+    factor = np.where(low, (values - min_val) / (mid_val - min_val) if mid_val != min_val else 0.0,
+                      (values - mid_val) / (max_val - mid_val) if max_val != mid_val else 0.0)
+    start = np.where(low[:, None], c0, c1)
+    end = np.where(low[:, None], c1, c2)
+    rgb = (start + (end - start) * factor[:, None]).astype(np.int64)
+    packed = (rgb[:, 0] << 16 | rgb[:, 1] << 8 | rgb[:, 2]).tolist()
+
+    out = [f'#{v:06x}' for v in packed]
+    # Endpoints return the configured colors unchanged
+    for i in np.flatnonzero(values <= min_val).tolist():
+        out[i] = colors[0]
+    for i in np.flatnonzero((values >= max_val) & (values > min_val)).tolist():
+        out[i] = colors[2]
+    return out
+
+@lru_cache(maxsize=512)
 def calculate_luminance(hex_color):
     r, g, b = [x / 255.0 for x in hex_to_rgb(hex_color)]
     r = r / 12.92 if r <= 0.03928 else ((r + 0.055) / 1.055) ** 2.4
@@ -73,70 +116,219 @@ def calculate_luminance(hex_color):
     b = b / 12.92 if b <= 0.03928 else ((b + 0.055) / 1.055) ** 2.4
     return 0.2126 * r + 0.7152 * g + 0.0722 * b
 
+@lru_cache(maxsize=512)
 def get_contrasting_text_color(bg_hex_color):
     return '#FFFFFF' if calculate_luminance(bg_hex_color) < 0.5 else '#000000'
 
 # ===== Formatting & dataframe utilities =====
+# format_spec['format'] for dates -> strftime pattern
+_DATE_FMTS = {
+    'YYYY-MM-DD': '%Y-%m-%d',
+    'MM/DD/YYYY': '%m/%d/%Y',
+    'DD/MM/YYYY': '%d/%m/%Y',
+    'DD MMM YYYY': '%d %b %Y',
+    'MMMM DD, YYYY': '%B %d, %Y',
+    'DD-MMM-YY': '%d-%b-%y',
+}
+
+def _fmt_default(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(int(value)) if value == int(value) else f"{value:.2f}"
+    return str(value)
+
+def _fmt_date(value, format_spec):
+    date_format = format_spec.get('format', 'YYYY-MM-DD')
+    try:
+        dt = pd.to_datetime(value, errors='coerce') if isinstance(value, str) else pd.Timestamp(value)
+        if pd.isna(dt):
+            return str(value)
+        return dt.strftime(_DATE_FMTS.get(date_format, '%Y-%m-%d'))
+    except Exception:
+        return str(value)
+
+def _fmt_currency(value, format_spec):
+    try:
+        num = float(value)
+        dp = format_spec.get('decimal_places', 2)
+        sym = format_spec.get('currency_symbol', '$')
+        return f"{sym}{num:,.{dp}f}"
+    except Exception:
+        return str(value)
+
+def _fmt_percentage(value, format_spec):
+    try:
+        num = float(value)
+        dp = format_spec.get('decimal_places', 1)
+        return f"{num:.{dp}f}%"
+    except Exception:
+        return str(value)
+
+def _fmt_number(value, format_spec):
+    try:
+        num = float(value)
+        dp = format_spec.get('decimal_places', 2)
+        ts = format_spec.get('thousands_separator', False)
+        return f"{num:,.{dp}f}" if ts else f"{num:.{dp}f}"
+    except Exception:
+        return str(value)
+
+# format_spec['type'] -> formatter(value, format_spec); unknown types fall back to str()
+_FMT = {
+    'date': _fmt_date,
+    'currency': _fmt_currency,
+    'percentage': _fmt_percentage,
+    'number': _fmt_number,
+}
+
+_BLANK_STRS = frozenset(('NaT', 'nan', 'None'))
+
 def format_value(value, format_spec=None):
     """
     Format values for display with optional format_spec:
       {'type': 'date'|'currency'|'percentage'|'number', ...}
     """
-    if pd.isna(value) or value is None or str(value) in ['NaT', 'nan', 'None']:
+    # Blank for NA/None and their string spellings; plain str/float/int skip pd.isna
+    t = type(value)
+    if value is None:
+        return ''
+    if t is str:
+        if value in _BLANK_STRS:
+            return ''
+    elif t is float or t is int:
+        if value != value:
+            return ''
+    elif pd.isna(value) or str(value) in _BLANK_STRS:
         return ''
 
     if not format_spec:
-        if isinstance(value, (int, float)) and not isinstance(value, bool):
-            return str(int(value)) if value == int(value) else f"{value:.2f}"
-        return str(value)
-
-    t = format_spec.get('type')
-
-    if t == 'date':
-        date_format = format_spec.get('format', 'YYYY-MM-DD')
-        try:
-            dt = pd.to_datetime(value, errors='coerce') if isinstance(value, str) else pd.Timestamp(value)
-            if pd.isna(dt):
-                return str(value)
-            fmts = {
-                'YYYY-MM-DD': '%Y-%m-%d',
-                'MM/DD/YYYY': '%m/%d/%Y',
-                'DD/MM/YYYY': '%d/%m/%Y',
-                'DD MMM YYYY': '%d %b %Y',
-                'MMMM DD, YYYY': '%B %d, %Y',
-                'DD-MMM-YY': '%d-%b-%y',
-            }
-            return dt.strftime(fmts.get(date_format, '%Y-%m-%d'))
-        except Exception:
-            return str(value)
-
+        return _fmt_default(value)
+
+    fmt = _FMT.get(format_spec.get('type'))
+    return fmt(value, format_spec) if fmt else str(value)
+
+# ===== Column formatters (shared by the PDF and DOCX tables) =====
+def _format_int_column(s):
+    return s.to_numpy().astype(str).tolist()
+
+def _format_float_column(s):
+    values = s.to_numpy()
+    out = np.full(len(values), '', dtype=object)
+    present = ~np.isnan(values)
+    whole = present & (values == np.floor(values))
+    frac = present & ~whole
+    out[whole] = np.char.mod('%d', values[whole]).astype(object)
+    out[frac] = np.char.mod('%.2f', values[frac]).astype(object)
+    return out.tolist()
+
+def _format_any_column(s):
+    # tolist() unboxes the whole column in one call; iterating the Series
+    # goes through its iterator protocol per element
+    return [format_value(v) for v in s.tolist()]
+
+# numpy dtype.kind -> column formatter; same output as format_value per cell
+_KIND_FORMATTERS = {
+    'i': _format_int_column,
+    'u': _format_int_column,
+    'b': _format_int_column,
+    'f': _format_float_column,
+}
+
+def _make_formatter(dtype):
+    """Pick a column formatter once per column instead of dispatching per cell"""
+    if isinstance(dtype, np.dtype):
+        return _KIND_FORMATTERS.get(dtype.kind, _format_any_column)
+    return _format_any_column
+
+def _numeric_pattern(spec):
+    """str.format pattern equivalent to format_value(v, spec) for a numeric v, or None"""
+    t = spec.get('type')
     if t == 'currency':
-        try:
-            num = float(value)
-            dp = format_spec.get('decimal_places', 2)
-            sym = format_spec.get('currency_symbol', '$')
-            return f"{sym}{num:,.{dp}f}"
-        except Exception:
-            return str(value)
+        sym = str(spec.get('currency_symbol', '$')).replace('{', '{{').replace('}', '}}')
+        pattern = f"{sym}{{:,.{spec.get('decimal_places', 2)}f}}"
+    elif t == 'percentage':
+        pattern = f"{{:.{spec.get('decimal_places', 1)}f}}%"
+    elif t == 'number':
+        sep = ',' if spec.get('thousands_separator', False) else ''
+        pattern = f"{{:{sep}.{spec.get('decimal_places', 2)}f}}"
+    else:
+        return None
+    try:
+        pattern.format(0.0)
+    except (ValueError, TypeError):
+        return None  # odd spec: let format_value handle (and fall back) per cell
+    return pattern
+
+def _format_date_column(s, spec):
+    """format_value(v, spec) for a 'date' spec, with one strftime pass over the column"""
+    fmt = _DATE_FMTS.get(spec.get('format', 'YYYY-MM-DD'), '%Y-%m-%d')
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.dt.strftime(fmt).fillna('').tolist()
+    values = s.tolist()
+    if not all(isinstance(v, str) for v in values):
+        return [format_value(v, spec) for v in values]
+    try:
+        parsed = _parse_dates(s, utc_fallback=False)
+    except (ValueError, TypeError):  # e.g. mixed UTC offsets: keep each value's own
+        return [format_value(v, spec) for v in values]
+    # Unparseable strings pass through; 'NaT'/'nan'/'None' render blank
+    return ['' if v in ('NaT', 'nan', 'None') else (f if isinstance(f, str) else v)
+            for v, f in zip(values, parsed.dt.strftime(fmt).tolist())]
+
+def _compile_formatter(spec, dtype):
+    """
+    Resolve a column's format spec once per table. Numeric columns with a
+    currency/percentage/number spec get a prebuilt str.format, 'date' specs
+    one strftime over the column; everything else goes through format_value
+    with the spec bound.
+    """
+    if not spec:
+        return _make_formatter(dtype)
+    if spec.get('type') == 'date':
+        return lambda s: _format_date_column(s, spec)
+    pattern = None
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iubf':
+        pattern = _numeric_pattern(spec)
+    if pattern is None:
+        return lambda s: [format_value(v, spec) for v in s.tolist()]
+    fmt = pattern.format
+    return lambda s: ['' if v != v else fmt(v) for v in s.tolist()]
+
+def format_column(s: pd.Series, format_spec=None) -> pd.Series:
+    """format_value applied to a whole column, with the spec resolved once"""
+    return pd.Series(_compile_formatter(format_spec, s.dtype)(s), index=s.index, dtype=object)
+
+def _nonempty_mask(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Boolean frame, True where a cell is neither NA nor ''.
+    Only object/string/categorical columns can hold '', so no full-frame str cast is needed.
+    """
+    mask = df.notna()
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object or isinstance(dtype, pd.StringDtype):
+            mask.iloc[:, i] &= df.iloc[:, i].ne('').to_numpy()
+        elif isinstance(dtype, pd.CategoricalDtype):
+            mask.iloc[:, i] &= df.iloc[:, i].astype(object).ne('').to_numpy()
+    return mask
+
+def _select_table_frame(df: pd.DataFrame, section_config) -> pd.DataFrame:
+    """
+    Apply clean_empty_cols / clean_empty_rows / drop_columns from a table section
+    as a single positional selection (no intermediate copies of df).
+    """
+    clean_cols = section_config.get('clean_empty_cols')
+    clean_rows = section_config.get('clean_empty_rows')
+    mask = _nonempty_mask(df) if (clean_cols or clean_rows) else None
 
-    if t == 'percentage':
-        try:
-            num = float(value)
-            dp = format_spec.get('decimal_places', 1)
-            return f"{num:.{dp}f}%"
-        except Exception:
-            return str(value)
+    keep_cols = ~df.columns.isin(section_config.get('drop_columns') or [])
+    if clean_cols:
+        keep_cols &= mask.any(axis=0).to_numpy()
+    # Rows are judged on every column, as before drop_columns was applied
+    keep_rows = mask.any(axis=1).to_numpy() if clean_rows else slice(None)
 
-    if t == 'number':
-        try:
-            num = float(value)
-            dp = format_spec.get('decimal_places', 2)
-            ts = format_spec.get('thousands_separator', False)
-            return f"{num:,.{dp}f}" if ts else f"{num:.{dp}f}"
-        except Exception:
-            return str(value)
+    return df.iloc[keep_rows, keep_cols]
 
-    return str(value)
+# A date string has at least one of these; columns whose sample has none skip the full parse
+_DATEISH_CHARS = ('-', '/', ':')
 
 def prepare_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
@@ -144,8 +336,9 @@ def prepare_dataframe(df: pd.DataFrame) -> pd.DataFrame:
         if pd.api.types.is_datetime64_any_dtype(df[col]):
             df[col] = df[col].dt.strftime('%Y-%m-%d')
         elif df[col].dtype == 'object':
-            sample = df[col].dropna().astype(str).head(10)
-            if len(sample) > 0 and sample.str.contains(r'[-/:]').any():
+            # Only the 10 sampled values are stringified, not the whole column
+            sample = [str(v) for v in df[col].dropna().head(10).tolist()]
+            if any(c in v for v in sample for c in _DATEISH_CHARS):
                 try:
                     temp = pd.to_datetime(df[col], errors='coerce')
                     parsed = temp.notna().sum()
@@ -156,330 +349,413 @@ def prepare_dataframe(df: pd.DataFrame) -> pd.DataFrame:
                     pass
     return df
 
-def evaluate_formatting_rules(df: pd.DataFrame, rules):
+# ===== Column views used by the rule engine =====
+# Each returns one value per row, equal to what the old per-row loops
+# computed for that cell, so a rule becomes a single mask over the column.
+def _str_values(s):
+    """str(v) for every value, as an object Series"""
+    return s.astype(object).astype(str)
+
+def _float_values(s):
+    """float(v) per value as a float64 array; NaN where float() fails"""
+    if pd.api.types.is_bool_dtype(s) or (pd.api.types.is_numeric_dtype(s)
+                                         and not pd.api.types.is_timedelta64_dtype(s)):
+        return s.to_numpy(dtype='float64', na_value=np.nan)
+    if not (s.dtype == object or isinstance(s.dtype, (pd.StringDtype, pd.CategoricalDtype))):
+        return np.full(len(s), np.nan)  # datetimes/timedeltas: float() raised
+    obj = s.astype(object)
+    values = pd.to_numeric(obj, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    # to_numeric is stricter than float() ('1_000', ' 12 ' ...); retry the misses
+    for i in np.flatnonzero(np.isnan(values) & obj.notna().to_numpy()).tolist():
+        try:
+            values[i] = float(obj.iat[i])
+        except Exception:
+            pass
+    return values
+
+def _parse_dates(s, utc_fallback=True):
     """
-    Returns:
-      {'rows': {row_idx: {...}}, 'cells': {(row_idx, col_idx): {...}}, 'warnings': [...]}
+    pd.to_datetime(v, errors='coerce') for every value, parsed as one column.
+    Mixed UTC offsets fall back to comparing in UTC (or raise, utc_fallback=False).
     """
-    if not rules:
-        return {'rows': {}, 'cells': {}, 'warnings': []}
-
-    style_map = {'rows': {}, 'cells': {}, 'warnings': []}
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    with warnings.catch_warnings():
+        # "could not infer format" / mixed-timezone deprecation chatter
+        warnings.simplefilter('ignore', UserWarning)
+        warnings.simplefilter('ignore', FutureWarning)
+        try:
+            # format='mixed' reads each value the way a scalar parse would;
+            # an inferred column format can flip day/month on later values
+            parsed = pd.to_datetime(s, errors='coerce', format='mixed')
+            if not pd.api.types.is_datetime64_any_dtype(parsed):
+                raise TypeError("mixed time zones")  # pandas fell back to object Timestamps
+        except (ValueError, TypeError):
+            if not utc_fallback:
+                raise
+            # e.g. mixed UTC offsets: compare everything in UTC
+            parsed = pd.to_datetime(s, errors='coerce', format='mixed', utc=True)
+    return parsed
+
+def _day_values(parsed):
+    """Calendar day of each parsed timestamp (local wall time), like Timestamp.date()"""
+    if parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_localize(None)
+    return parsed.dt.normalize()
+
+def _day_ns(value):
+    """int64 ns of value's calendar day (local wall time), on the same axis as _day_values"""
+    ts = pd.to_datetime(value)
+    if ts.tz is not None:
+        ts = ts.tz_localize(None)
+    return ts.normalize().value
+
+class _ColumnPlan:
+    """
+    Column views for one evaluate_formatting_rules call. Each referenced
+    column is converted at most once per view, however many rules read it.
+    Views are shared between rules, so callers must not modify them. Rule
+    threads may race to build the same view; the loser's copy is just dropped.
+    """
+    def __init__(self, df):
+        self._df = df
+        self._views = {}
+
+    def _view(self, kind, column, build):
+        key = (kind, column)
+        if key not in self._views:
+            self._views[key] = build()
+        return self._views[key]
+
+    def strs(self, column):
+        return self._view('str', column, lambda: _str_values(self._df[column]))
+
+    def lower(self, column):
+        return self._view('lower', column, lambda: self.strs(column).str.lower())
+
+    def floats(self, column):
+        return self._view('float', column, lambda: _float_values(self._df[column]))
+
+    def dates(self, column):
+        return self._view('date', column, lambda: _parse_dates(self._df[column]))
+
+    def days(self, column):
+        return self._view('day', column, lambda: _day_values(self.dates(column)).to_numpy())
+
+def _cell_keys(positions, col_idx):
+    """style_map['cells'] keys for body-row positions (+1 for the header row)"""
+    return [(i + 1, col_idx) for i in positions.tolist()]
+
+class _BgStyles(dict):
+    """bg hex -> {'bg_color': bg}; every cell with the same color shares one dict"""
+    def __missing__(self, bg):
+        style = self[bg] = {'bg_color': bg}
+        return style
+
+# Rule 'operator' -> comparison, applied to a whole column at once
+_CMP = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+}
+
+def _compare_mask(values, op, target):
+    """Boolean mask for `values <op> target`; all False for unknown ops or incomparable types"""
+    cmp = _CMP.get(op)
+    if cmp is None:
+        return np.zeros(len(values), dtype=bool)
+    try:
+        return np.asarray(cmp(values, target), dtype=bool)
+    except TypeError:
+        return np.zeros(len(values), dtype=bool)
 
-    for rule in rules:
-        scope = rule.get('scope', 'cell')
-        condition = rule.get('condition', {})
-        style = rule.get('style', {})
-
-        # ---- Row-scope ----
-        if scope == 'row':
-            target_column = rule.get('target_column')
-            if not target_column or target_column not in df.columns:
-                continue
-            cond_type = condition.get('type')
-
-            if cond_type == 'contains':
-                search = str(condition.get('value', '')).lower()
-                for idx, row in df.iterrows():
-                    if search in str(row[target_column]).lower():
-                        style_map['rows'][df.index.get_loc(idx)] = style
-
-            elif cond_type == 'equals':
-                val = condition.get('value', '')
-                for idx, row in df.iterrows():
-                    if str(row[target_column]).strip() == str(val):
-                        style_map['rows'][df.index.get_loc(idx)] = style
-
-            elif cond_type == 'date_compare':
-                op = condition.get('operator', '>')
-                compare_to = condition.get('compare_to')
-                compare_value = condition.get('value')
-
-                # resolve target_date
-                if compare_to == 'today':
-                    target_date = datetime.now(sg_tz).date()
-                elif compare_to in ['start_date', 'end_date']:
-                    try:
-                        target_date = globals().get(compare_to)
-                        if target_date is None:
-                            style_map['warnings'].append(f"compare_to='{compare_to}' not found in context")
-                            continue
-                        target_date = pd.to_datetime(target_date, errors='coerce')
-                        if pd.isna(target_date):
-                            style_map['warnings'].append(f"compare_to='{compare_to}' not parseable")
-                            continue
-                        target_date = target_date.date() if hasattr(target_date, 'date') else target_date
-                    except Exception as e:
-                        style_map['warnings'].append(f"Error accessing '{compare_to}': {e}")
-                        continue
-                elif compare_value:
-                    target_date = pd.to_datetime(compare_value, errors='coerce')
+def _eval_rule(df, rule, plan, bg_styles, today):
+    """
+    Evaluate one formatting rule into its own partial style map.
+    Rows are addressed by position (0-based; cells add 1 for the header),
+    never through df.index, which may be non-unique.
+    """
+    out = {'rows': {}, 'cells': {}, 'warnings': []}
+    scope = rule.get('scope', 'cell')
+    condition = rule.get('condition', {})
+    style = rule.get('style', {})
+
+    # ---- Row-scope ----
+    if scope == 'row':
+        target_column = rule.get('target_column')
+        if not target_column or target_column not in df.columns:
+            return out
+        cond_type = condition.get('type')
+
+        if cond_type == 'contains':
+            search = str(condition.get('value', '')).lower()
+            mask = plan.lower(target_column).str.contains(search, regex=False)
+            out['rows'].update(zip(np.flatnonzero(mask.to_numpy()).tolist(), repeat(style)))
+
+        elif cond_type == 'equals':
+            val = condition.get('value', '')
+            mask = plan.strs(target_column).str.strip().eq(str(val))
+            out['rows'].update(zip(np.flatnonzero(mask.to_numpy()).tolist(), repeat(style)))
+
+        elif cond_type == 'date_compare':
+            op = condition.get('operator', '>')
+            compare_to = condition.get('compare_to')
+            compare_value = condition.get('value')
+
+            # resolve target_date
+            if compare_to == 'today':
+                target_date = today
+            elif compare_to in ['start_date', 'end_date']:
+                try:
+                    target_date = globals().get(compare_to)
+                    if target_date is None:
+                        out['warnings'].append(f"compare_to='{compare_to}' not found in context")
+                        return out
+                    target_date = pd.to_datetime(target_date, errors='coerce')
                     if pd.isna(target_date):
-                        style_map['warnings'].append(f"Fixed date '{compare_value}' not parseable")
-                        continue
+                        out['warnings'].append(f"compare_to='{compare_to}' not parseable")
+                        return out
                     target_date = target_date.date() if hasattr(target_date, 'date') else target_date
-                else:
-                    style_map['warnings'].append("date_compare missing 'compare_to' or 'value'")
-                    continue
+                except Exception as e:
+                    out['warnings'].append(f"Error accessing '{compare_to}': {e}")
+                    return out
+            elif compare_value:
+                target_date = pd.to_datetime(compare_value, errors='coerce')
+                if pd.isna(target_date):
+                    out['warnings'].append(f"Fixed date '{compare_value}' not parseable")
+                    return out
+                target_date = target_date.date() if hasattr(target_date, 'date') else target_date
+            else:
+                out['warnings'].append("date_compare missing 'compare_to' or 'value'")
+                return out
+
+            parse_failures = int(plan.dates(target_column).isna().sum())
+            mask = _compare_mask(plan.days(target_column), op, np.datetime64(target_date, 'ns'))
+            out['rows'].update(zip(np.flatnonzero(mask).tolist(), repeat(style)))
+            if parse_failures:
+                out['warnings'].append(
+                    f"date_compare on '{target_column}': {parse_failures} rows unparseable"
+                )
+
+    # ---- Cell-scope ----
+    elif scope == 'cell':
+        target_column = rule.get('target_column')
+        if not target_column or target_column not in df.columns:
+            return out
+        col_idx = df.columns.get_loc(target_column)
+        cond_type = condition.get('type')
+
+        if cond_type == 'equals':
+            val = condition.get('value')
+            mask = plan.strs(target_column).eq(str(val))
+            out['cells'].update(zip(_cell_keys(np.flatnonzero(mask.to_numpy()), col_idx), repeat(style)))
+
+        elif cond_type == 'contains':
+            val = str(condition.get('value', '')).lower()
+            mask = plan.lower(target_column).str.contains(val, regex=False)
+            out['cells'].update(zip(_cell_keys(np.flatnonzero(mask.to_numpy()), col_idx), repeat(style)))
+
+        elif cond_type == 'numeric':
+            op = condition.get('operator', '>')
+            thr = condition.get('value', 0)
+            # numpy scalars / Decimal compare as floats; non-numeric thresholds never matched
+            if isinstance(thr, (numbers.Real, Decimal)):
+                mask = _compare_mask(plan.floats(target_column), op, float(thr))
+                out['cells'].update(zip(_cell_keys(np.flatnonzero(mask), col_idx), repeat(style)))
+
+        elif cond_type == 'date_compare':
+            op = condition.get('operator', '>')
+            compare_to = condition.get('compare_to')
+            compare_value = condition.get('value')
+
+            if compare_to == 'today':
+                target_date = today
+            elif compare_to in ['start_date', 'end_date']:
+                try:
+                    target_date = globals().get(compare_to)
+                    if target_date is None:
+                        out['warnings'].append(f"compare_to='{compare_to}' not found")
+                        return out
+                    target_date = pd.to_datetime(target_date, errors='coerce')
+                    if pd.isna(target_date):
+                        out['warnings'].append(f"compare_to='{compare_to}' not parseable")
+                        return out
+                    target_date = target_date.date() if hasattr(target_date, 'date') else target_date
+                except Exception as e:
+                    out['warnings'].append(f"Error accessing '{compare_to}': {e}")
+                    return out
+            elif compare_value:
+                target_date = pd.to_datetime(compare_value, errors='coerce')
+                if pd.isna(target_date):
+                    out['warnings'].append(f"Fixed date '{compare_value}' not parseable")
+                    return out
+                target_date = target_date.date() if hasattr(target_date, 'date') else target_date
+            else:
+                out['warnings'].append("date_compare missing 'compare_to' or 'value'")
+                return out
+
+            parse_failures = int(plan.dates(target_column).isna().sum())
+            mask = _compare_mask(plan.days(target_column), op, np.datetime64(target_date, 'ns'))
+            out['cells'].update(zip(_cell_keys(np.flatnonzero(mask), col_idx), repeat(style)))
+            if parse_failures:
+                out['warnings'].append(
+                    f"'{target_column}' date comparison: {parse_failures} invalid dates"
+                )
+
+        elif cond_type == 'date_compare_column':
+            op = condition.get('operator', '>')
+            compare_column = condition.get('compare_column')
+            if not compare_column or compare_column not in df.columns:
+                out['warnings'].append(f"Compare column '{compare_column}' not found")
+                return out
+
+            d1 = plan.dates(target_column)
+            d2 = plan.dates(compare_column)
+            if (d1.dt.tz is None) != (d2.dt.tz is None):
+                # tz-aware vs naive columns: no row can be compared
+                mask = np.zeros(len(df), dtype=bool)
+                parse_failures = len(df)
+            else:
+                mask = _compare_mask(d1.to_numpy(), op, d2.to_numpy())
+                parse_failures = int((d1.isna() | d2.isna()).sum())
+            out['cells'].update(zip(_cell_keys(np.flatnonzero(mask), col_idx), repeat(style)))
+
+            if parse_failures:
+                out['warnings'].append(
+                    f"'{target_column}' vs '{compare_column}': {parse_failures} invalid dates"
+                )
+
+        elif cond_type == 'color_scale':
+            scale_type = condition.get('scale_type', 'numeric')
+            if scale_type == 'categorical':
+                color_map = condition.get('color_map', {})
+                if not color_map:
+                    out['warnings'].append("color_scale categorical missing 'color_map'")
+                    return out
+                # text color calculation is done in PDF renderer if needed
+                style_by_val = {val: bg_styles[bg] for val, bg in color_map.items()}
+                col = plan.strs(target_column)
+                hit = col.isin(list(style_by_val)).to_numpy()
+                positions = np.flatnonzero(hit)
+                styles = col.map(style_by_val).to_numpy()[positions]
+                out['cells'].update(zip(_cell_keys(positions, col_idx), styles))
+                # Distinct values in first-seen row order, so the warning shows the
+                # first three unmapped values; missing cells read 'nan'/'None' (str(v))
+                unmapped = pd.unique(col.to_numpy()[~hit]).tolist()
+                if unmapped:
+                    head = ', '.join(unmapped[:3])
+                    suffix = '...' if len(unmapped) > 3 else ''
+                    out['warnings'].append(
+                        f"'{target_column}' categorical color scale: {len(unmapped)} unmapped values ({head}{suffix})"
+                    )
 
-                parse_failures = 0
-                for idx, row in df.iterrows():
-                    try:
-                        cell_date = pd.to_datetime(row[target_column], errors='coerce')
-                        if pd.isna(cell_date):
-                            parse_failures += 1
-                            continue
-                        cell_date = cell_date.date() if hasattr(cell_date, 'date') else cell_date
-
-                        match = (
-                            (op == '>' and cell_date > target_date) or
-                            (op == '>=' and cell_date >= target_date) or
-                            (op == '<' and cell_date < target_date) or
-                            (op == '<=' and cell_date <= target_date) or
-                            (op == '==' and cell_date == target_date)
-                        )
-                        if match:
-                            style_map['rows'][df.index.get_loc(idx)] = style
-                    except Exception:
-                        parse_failures += 1
-                        continue
-                if parse_failures:
-                    style_map['warnings'].append(
-                        f"date_compare on '{target_column}': {parse_failures} rows unparseable"
+            elif scale_type == 'numeric':
+                mode = condition.get('mode', 'auto')
+                colors3 = condition.get('colors', ['#00FF00', '#FFFF00', '#FF0000'])
+                if len(colors3) != 3:
+                    out['warnings'].append("color_scale numeric requires exactly 3 colors")
+                    return out
+
+                values = plan.floats(target_column)
+                positions = np.flatnonzero(~np.isnan(values))
+                if not len(positions):
+                    out['warnings'].append(f"'{target_column}' has no valid numeric values")
+                    return out
+                values = values[positions]
+
+                if mode == 'auto':
+                    min_val, max_val = float(values.min()), float(values.max())
+                    mid_val = (min_val + max_val) / 2
+                else:
+                    min_val = condition.get('min')
+                    mid_val = condition.get('mid')
+                    max_val = condition.get('max')
+                    if None in (min_val, mid_val, max_val) or not (min_val < mid_val < max_val):
+                        out['warnings'].append("color_scale manual requires valid min < mid < max")
+                        return out
+
+                bgs = _gradient_colors(values, min_val, mid_val, max_val, colors3)
+                out['cells'].update(zip(_cell_keys(positions, col_idx), map(bg_styles.__getitem__, bgs)))
+
+            elif scale_type == 'date':
+                mode = condition.get('mode', 'auto')
+                colors3 = condition.get('colors', ['#00FF00', '#FFFF00', '#FF0000'])
+                if len(colors3) != 3:
+                    out['warnings'].append("color_scale date requires exactly 3 colors")
+                    return out
+
+                valid = plan.dates(target_column).notna().to_numpy()
+                positions = np.flatnonzero(valid)
+                failures = len(valid) - len(positions)
+                # Gradient axis: int64 ns of each calendar day. Day-aligned ns are
+                # multiples of 2**16, so the float math is exact and colors match
+                # the old Timestamp.toordinal() axis
+                day_ns = plan.days(target_column)[positions].astype(np.int64)
+                if not len(positions):
+                    out['warnings'].append(f"'{target_column}' has no valid dates")
+                    return out
+                if failures:
+                    out['warnings'].append(
+                        f"'{target_column}' date color scale: {failures} invalid dates"
                     )
 
-        # ---- Cell-scope ----
-        elif scope == 'cell':
-            target_column = rule.get('target_column')
-            if not target_column or target_column not in df.columns:
-                continue
-            col_idx = df.columns.get_loc(target_column)
-            cond_type = condition.get('type')
-
-            if cond_type == 'equals':
-                val = condition.get('value')
-                for idx, row in df.iterrows():
-                    if str(row[target_column]) == str(val):
-                        style_map['cells'][(df.index.get_loc(idx) + 1, col_idx)] = style  # +1 header
-
-            elif cond_type == 'contains':
-                val = str(condition.get('value', '')).lower()
-                for idx, row in df.iterrows():
-                    if val in str(row[target_column]).lower():
-                        style_map['cells'][(df.index.get_loc(idx) + 1, col_idx)] = style
-
-            elif cond_type == 'numeric':
-                op = condition.get('operator', '>')
-                thr = condition.get('value', 0)
-                for idx, row in df.iterrows():
+                if mode == 'auto':
+                    min_val, max_val = int(day_ns.min()), int(day_ns.max())
+                    mid_val = (min_val + max_val) / 2
+                else:
                     try:
-                        num = float(row[target_column])
-                        match = (
-                            (op == '>' and num > thr) or
-                            (op == '>=' and num >= thr) or
-                            (op == '<' and num < thr) or
-                            (op == '<=' and num <= thr) or
-                            (op == '==' and num == thr)
-                        )
-                        if match:
-                            style_map['cells'][(df.index.get_loc(idx) + 1, col_idx)] = style
+                        min_val = _day_ns(condition.get('min'))
+                        mid_val = _day_ns(condition.get('mid'))
+                        max_val = _day_ns(condition.get('max'))
+                        if not (min_val < mid_val < max_val):
+                            out['warnings'].append("date scale requires min < mid < max")
+                            return out
                     except Exception:
-                        continue
+                        out['warnings'].append("date scale manual: invalid date(s)")
+                        return out
 
-            elif cond_type == 'date_compare':
-                op = condition.get('operator', '>')
-                compare_to = condition.get('compare_to')
-                compare_value = condition.get('value')
+                bgs = _gradient_colors(day_ns, min_val, mid_val, max_val, colors3)
+                out['cells'].update(zip(_cell_keys(positions, col_idx), map(bg_styles.__getitem__, bgs)))
 
-                if compare_to == 'today':
-                    target_date = datetime.now(sg_tz).date()
-                elif compare_to in ['start_date', 'end_date']:
-                    try:
-                        target_date = globals().get(compare_to)
-                        if target_date is None:
-                            style_map['warnings'].append(f"compare_to='{compare_to}' not found")
-                            continue
-                        target_date = pd.to_datetime(target_date, errors='coerce')
-                        if pd.isna(target_date):
-                            style_map['warnings'].append(f"compare_to='{compare_to}' not parseable")
-                            continue
-                        target_date = target_date.date() if hasattr(target_date, 'date') else target_date
-                    except Exception as e:
-                        style_map['warnings'].append(f"Error accessing '{compare_to}': {e}")
-                        continue
-                elif compare_value:
-                    target_date = pd.to_datetime(compare_value, errors='coerce')
-                    if pd.isna(target_date):
-                        style_map['warnings'].append(f"Fixed date '{compare_value}' not parseable")
-                        continue
-                    target_date = target_date.date() if hasattr(target_date, 'date') else target_date
-                else:
-                    style_map['warnings'].append("date_compare missing 'compare_to' or 'value'")
-                    continue
+    return out
 
-                parse_failures = 0
-                for idx, row in df.iterrows():
-                    try:
-                        cell_date = pd.to_datetime(row[target_column], errors='coerce')
-                        if pd.isna(cell_date):
-                            parse_failures += 1
-                            continue
-                        cell_date = cell_date.date() if hasattr(cell_date, 'date') else cell_date
-
-                        match = (
-                            (op == '>' and cell_date > target_date) or
-                            (op == '>=' and cell_date >= target_date) or
-                            (op == '<' and cell_date < target_date) or
-                            (op == '<=' and cell_date <= target_date) or
-                            (op == '==' and cell_date == target_date)
-                        )
-                        if match:
-                            style_map['cells'][(df.index.get_loc(idx) + 1, col_idx)] = style
-                    except Exception:
-                        parse_failures += 1
-                        continue
-                if parse_failures:
-                    style_map['warnings'].append(
-                        f"'{target_column}' date comparison: {parse_failures} invalid dates"
-                    )
+# Rule count below which a thread pool costs more than it saves
+_MIN_PARALLEL_RULES = 4
 
-            elif cond_type == 'date_compare_column':
-                op = condition.get('operator', '>')
-                compare_column = condition.get('compare_column')
-                if not compare_column or compare_column not in df.columns:
-                    style_map['warnings'].append(f"Compare column '{compare_column}' not found")
-                    continue
+def evaluate_formatting_rules(df: pd.DataFrame, rules, max_workers=None):
+    """
+    Returns:
+      {'rows': {row_idx: {...}}, 'cells': {(row_idx, col_idx): {...}}, 'warnings': [...]}
 
-                parse_failures = 0
-                for idx, row in df.iterrows():
-                    try:
-                        d1 = pd.to_datetime(row[target_column], errors='coerce')
-                        d2 = pd.to_datetime(row[compare_column], errors='coerce')
-                        if pd.isna(d1) or pd.isna(d2):
-                            parse_failures += 1
-                            continue
-
-                        match = (
-                            (op == '>' and d1 > d2) or
-                            (op == '>=' and d1 >= d2) or
-                            (op == '<' and d1 < d2) or
-                            (op == '<=' and d1 <= d2) or
-                            (op == '==' and d1 == d2)
-                        )
-                        if match:
-                            style_map['cells'][(df.index.get_loc(idx) + 1, df.columns.get_loc(target_column))] = style
-                    except Exception:
-                        parse_failures += 1
-                        continue
+    max_workers: evaluate rules on this many threads (vectorized numeric and
+    datetime comparisons release the GIL). Results are merged in rule order,
+    so later rules still override earlier ones.
+    """
+    if not rules:
+        return {'rows': {}, 'cells': {}, 'warnings': []}
 
-                if parse_failures:
-                    style_map['warnings'].append(
-                        f"'{target_column}' vs '{compare_column}': {parse_failures} invalid dates"
-                    )
+    style_map = {'rows': {}, 'cells': {}, 'warnings': []}
+
+    # SG date, resolved once so every rule sees the same day
+    uses_today = any(r.get('condition', {}).get('compare_to') == 'today' for r in rules)
+    today = datetime.now(sg_tz).date() if uses_today else None
+    bg_styles = _BgStyles()  # color_scale cell styles, interned by color
+    plan = _ColumnPlan(df)
+
+    def evaluate(rule):
+        return _eval_rule(df, rule, plan, bg_styles, today)
+
+    if max_workers and max_workers > 1 and len(rules) >= _MIN_PARALLEL_RULES:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(rules))) as pool:
+            partials = list(pool.map(evaluate, rules))
+    else:
+        partials = map(evaluate, rules)
 
-            elif cond_type == 'color_scale':
-                scale_type = condition.get('scale_type', 'numeric')
-                if scale_type == 'categorical':
-                    color_map = condition.get('color_map', {})
-                    if not color_map:
-                        style_map['warnings'].append("color_scale categorical missing 'color_map'")
-                        continue
-                    unmapped = set()
-                    for idx, row in df.iterrows():
-                        val = str(row[target_column])
-                        if val in color_map:
-                            bg = color_map[val]
-                            style_map['cells'][(df.index.get_loc(idx) + 1, col_idx)] = {
-                                'bg_color': bg,
-                                # text color calculation is done in PDF renderer if needed
-                            }
-                        else:
-                            unmapped.add(val)
-                    if unmapped:
-                        head = ', '.join(list(unmapped)[:3])
-                        suffix = '...' if len(unmapped) > 3 else ''
-                        style_map['warnings'].append(
-                            f"'{target_column}' categorical color scale: {len(unmapped)} unmapped values ({head}{suffix})"
-                        )
-
-                elif scale_type == 'numeric':
-                    mode = condition.get('mode', 'auto')
-                    colors3 = condition.get('colors', ['#00FF00', '#FFFF00', '#FF0000'])
-                    if len(colors3) != 3:
-                        style_map['warnings'].append("color_scale numeric requires exactly 3 colors")
-                        continue
-
-                    numeric_values = []
-                    for idx, row in df.iterrows():
-                        try:
-                            v = float(row[target_column])
-                            if not pd.isna(v):
-                                numeric_values.append((idx, v))
-                        except Exception:
-                            continue
-                    if not numeric_values:
-                        style_map['warnings'].append(f"'{target_column}' has no valid numeric values")
-                        continue
-
-                    if mode == 'auto':
-                        all_vals = [v for _, v in numeric_values]
-                        min_val, max_val = min(all_vals), max(all_vals)
-                        mid_val = (min_val + max_val) / 2
-                    else:
-                        min_val = condition.get('min')
-                        mid_val = condition.get('mid')
-                        max_val = condition.get('max')
-                        if None in (min_val, mid_val, max_val) or not (min_val < mid_val < max_val):
-                            style_map['warnings'].append("color_scale manual requires valid min < mid < max")
-                            continue
-
-                    for idx, value in numeric_values:
-                        bg = get_gradient_color(value, min_val, mid_val, max_val, colors3)
-                        style_map['cells'][(df.index.get_loc(idx) + 1, col_idx)] = {'bg_color': bg}
-
-                elif scale_type == 'date':
-                    mode = condition.get('mode', 'auto')
-                    colors3 = condition.get('colors', ['#00FF00', '#FFFF00', '#FF0000'])
-                    if len(colors3) != 3:
-                        style_map['warnings'].append("color_scale date requires exactly 3 colors")
-                        continue
-
-                    date_values, failures = [], 0
-                    for idx, row in df.iterrows():
-                        try:
-                            d = pd.to_datetime(row[target_column], errors='coerce')
-                            if pd.isna(d):
-                                failures += 1
-                                continue
-                            date_values.append((idx, d.toordinal()))
-                        except Exception:
-                            failures += 1
-                    if not date_values:
-                        style_map['warnings'].append(f"'{target_column}' has no valid dates")
-                        continue
-                    if failures:
-                        style_map['warnings'].append(
-                            f"'{target_column}' date color scale: {failures} invalid dates"
-                        )
-
-                    if mode == 'auto':
-                        vals = [v for _, v in date_values]
-                        min_val, max_val = min(vals), max(vals)
-                        mid_val = (min_val + max_val) / 2
-                    else:
-                        try:
-                            min_val = pd.to_datetime(condition.get('min')).toordinal()
-                            mid_val = pd.to_datetime(condition.get('mid')).toordinal()
-                            max_val = pd.to_datetime(condition.get('max')).toordinal()
-                            if not (min_val < mid_val < max_val):
-                                style_map['warnings'].append("date scale requires min < mid < max")
-                                continue
-                        except Exception:
-                            style_map['warnings'].append("date scale manual: invalid date(s)")
-                            continue
-
-                    for idx, ordv in date_values:
-                        bg = get_gradient_color(ordv, min_val, mid_val, max_val, colors3)
-                        style_map['cells'][(df.index.get_loc(idx) + 1, col_idx)] = {'bg_color': bg}
+    for partial in partials:
+        style_map['rows'].update(partial['rows'])
+        style_map['cells'].update(partial['cells'])
+        style_map['warnings'].extend(partial['warnings'])
 
     return style_map
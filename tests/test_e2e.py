@@ -69,3 +69,154 @@ def test_generate_pdf_and_docx(tmp_path):
         format="docx"
     )
     assert os.path.exists(docx_path) and os.path.getsize(docx_path) > 1000
+
+
+def test_docx_parallel_sections_match_sequential(tmp_path):
+    import zipfile
+    from reportlabcustom.docx import _generate_docx_report
+
+    df = pd.DataFrame({"Name": ["A", "B", "C"], "Score": [1.5, 2.0, None]})
+    template = [{"type": "title", "title": "Parallel"}]
+    template += [{"type": "table", "title": f"T{i}", "df": df} for i in range(3)]
+    template += [{"type": "table_grouped", "df": df, "groupby": "Name"}]
+
+    seq = _generate_docx_report(template, str(tmp_path / "seq.docx"), report_colors)
+    par = generate_report(template, format="docx", output_filename=str(tmp_path / "par"), max_workers=2)
+
+    def body(path):
+        with zipfile.ZipFile(path) as z:
+            return z.read("word/document.xml")
+
+    assert body(seq) == body(par)
+
+
+def test_docx_applies_column_and_cell_formats(tmp_path):
+    import zipfile
+    from reportlabcustom.docx import _generate_docx_report
+
+    df = pd.DataFrame({"Amount": [1234.5, None, 7.0], "Pct": [12.345, 50.0, 0.0], "Qty": [1, 2, 3]})
+    template = [{
+        "type": "table", "df": df,
+        "column_formats": {
+            "Amount": {"type": "currency", "decimal_places": 2, "currency_symbol": "$"},
+            "Pct": {"type": "percentage", "decimal_places": 1},
+        },
+        "cell_formats": {(3, 2): {"type": "number", "decimal_places": 2}},
+    }]
+    out = _generate_docx_report(template, str(tmp_path / "fmt.docx"), report_colors)
+    with zipfile.ZipFile(out) as z:
+        xml = z.read("word/document.xml").decode("utf-8")
+
+    for text in ("$1,234.50", "$7.00", "12.3%", "50.0%", "0.0%", ">1<", ">2<", "3.00"):
+        assert text in xml
+
+
+def test_generate_pdf_reports_batch(tmp_path):
+    from reportlabcustom import generate_pdf_reports_batch
+
+    df = pd.DataFrame({"Name": ["Alpha", "Beta"], "Score": [1.5, 2.0]})
+    jobs = [
+        {"report_sections": [{"type": "title", "title": f"Report {i}"},
+                             {"type": "table", "df": df}],
+         "output_filename": str(tmp_path / f"batch_{i}")}
+        for i in range(3)
+    ]
+
+    paths = generate_pdf_reports_batch(jobs, max_workers=2)
+    assert paths == [str(tmp_path / f"batch_{i}.pdf") for i in range(3)]
+    for p in paths:
+        with open(p, "rb") as f:
+            assert f.read(5) == b"%PDF-"
+
+
+def test_streaming_keeps_trailing_title_with_next_section(tmp_path):
+    from reportlab.platypus import Frame, PageTemplate, Paragraph, Spacer
+
+    from reportlabcustom.pdf import StreamingDocTemplate, _TABLE_TITLE_STYLE
+
+    placed = []
+
+    class Doc(StreamingDocTemplate):
+        def afterFlowable(self, flowable):
+            if isinstance(flowable, Paragraph):
+                placed.append((flowable.getPlainText(), self.page))
+
+    doc = Doc(str(tmp_path / "stream.pdf"))
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id="f")
+    doc.addPageTemplates([PageTemplate(id="p", frames=[frame])])
+    progress = []
+    doc.setProgressCallBack(lambda typ, value: progress.append((typ, value)))
+
+    # The title fits at the foot of page 1; the next section's body does not.
+    title = Paragraph("Orphan?", _TABLE_TITLE_STYLE)
+    assert title.getKeepWithNext()
+    stories = [[Spacer(1, doc.height - 60), title], [], [Spacer(1, 100), Paragraph("Body", _TABLE_TITLE_STYLE.parent)]]
+    doc.build_stream(iter(stories))
+
+    assert placed == [("Orphan?", 2), ("Body", 2)]
+    assert progress[0] == ("STARTED", 0) and progress[-1] == ("FINISHED", 0)
+    assert any(typ == "PROGRESS" for typ, _ in progress)
+
+
+def test_formatting_rules_workers_reaches_rule_engine(tmp_path, monkeypatch):
+    from reportlabcustom import pdf
+
+    seen = []
+    real = pdf.evaluate_formatting_rules
+
+    def spy(df, rules, max_workers=None):
+        seen.append(max_workers)
+        return real(df, rules, max_workers=max_workers)
+
+    monkeypatch.setattr(pdf, "evaluate_formatting_rules", spy)
+    df = pd.DataFrame({"Team": ["A", "B"], "Qty": [1, 9]})
+    rule = {"scope": "cell", "target_column": "Qty",
+            "condition": {"type": "numeric", "operator": ">", "value": 5}, "style": {"bold": True}}
+    template = [
+        {"type": "table", "df": df, "formatting_rules": [rule] * 4, "formatting_rules_workers": 2},
+        {"type": "table_grouped", "df": df, "groupby": "Team",
+         "formatting_rules": [rule], "formatting_rules_workers": 3},
+    ]
+    generate_report(template, format="pdf", output_filename=str(tmp_path / "rules"))
+    assert seen == [2, 3, 3]
+
+
+def test_docx_skips_image_removed_after_first_use(tmp_path):
+    from PIL import Image as PILImage
+
+    img = tmp_path / "logo.png"
+    PILImage.new("RGB", (4, 4), "red").save(img)
+    template = [{"type": "image", "image_path": str(img), "width": 1}]
+
+    generate_report(template, format="docx", output_filename=str(tmp_path / "first"))
+    img.write_bytes(b"")
+    generate_report(template, format="docx", output_filename=str(tmp_path / "emptied"))
+    img.unlink()
+    path = generate_report(template, format="docx", output_filename=str(tmp_path / "gone"))
+    assert os.path.getsize(path) > 0
+
+
+def test_streaming_lays_out_every_section(tmp_path):
+    from pypdf import PdfReader
+
+    # Far more sections than the first top-up batch holds, including empty ones
+    template = [{"type": "title", "title": "Stream"}]
+    for i in range(40):
+        template.append({"type": "text", "content": f"Section-{i:02d}-body"})
+        template.append({"type": "table", "df": pd.DataFrame()})
+    path = generate_report(template, format="pdf", output_filename=str(tmp_path / "stream"))
+
+    text = "".join(page.extract_text() for page in PdfReader(path).pages)
+    assert [f"Section-{i:02d}-body" in text for i in range(40)] == [True] * 40
+
+
+def test_streaming_refuses_a_build_that_copies_its_list(tmp_path, monkeypatch):
+    import pytest
+    from reportlab.platypus import BaseDocTemplate
+
+    real_build = BaseDocTemplate.build
+    monkeypatch.setattr(BaseDocTemplate, "build",
+                        lambda self, flowables, **kw: real_build(self, list(flowables), **kw))
+    template = [{"type": "text", "content": f"Section {i}"} for i in range(10)]
+    with pytest.raises(RuntimeError, match="every section"):
+        generate_report(template, format="pdf", output_filename=str(tmp_path / "copied"))
@@ -0,0 +1,137 @@
+import pandas as pd
+
+from reportlabcustom.utils import _select_table_frame
+
+
+def test_select_table_frame_matches_readme_cleaning_example():
+    # README "Cleaning Flags" example: B is all '', rows 1 and 3 are all NA/''
+    df = pd.DataFrame({
+        "A": ["x", "", None, ""],
+        "B": ["", "", "", ""],
+        "C": [1, None, 3, None],
+    })
+
+    both = _select_table_frame(df, {"clean_empty_cols": True, "clean_empty_rows": True})
+    assert list(both.columns) == ["A", "C"]
+    assert list(both.index) == [0, 2]
+
+    cols_only = _select_table_frame(df, {"clean_empty_cols": True})
+    assert list(cols_only.columns) == ["A", "C"] and len(cols_only) == 4
+
+    dropped = _select_table_frame(df, {"drop_columns": ["C", "missing"]})
+    assert list(dropped.columns) == ["A", "B"] and len(dropped) == 4
+
+    # Categorical '' counts as empty too
+    cat = df.assign(B=df["B"].astype("category"), D=pd.Categorical(["", "", "y", ""]))
+    both = _select_table_frame(cat, {"clean_empty_cols": True, "clean_empty_rows": True})
+    assert list(both.columns) == ["A", "C", "D"]
+    assert list(both.index) == [0, 2]
+
+
+def test_compile_formatter_matches_format_value():
+    import numpy as np
+
+    from reportlabcustom.utils import _compile_formatter, format_value
+
+    s = pd.Series([1234.5, np.nan, -0.125, 7.0])
+    for spec in (
+        None,
+        {"type": "currency", "currency_symbol": "€", "decimal_places": 0},
+        {"type": "percentage"},
+        {"type": "number", "thousands_separator": True},
+    ):
+        assert _compile_formatter(spec, s.dtype)(s) == [format_value(v, spec) for v in s.tolist()]
+
+
+def test_formatting_rules_use_row_positions():
+    from reportlabcustom.utils import evaluate_formatting_rules
+
+    # Non-unique index: rule hits are reported by row position
+    df = pd.DataFrame(
+        {"Status": ["Active", "Pending", "active", None],
+         "Qty": [3, 12, "7", "n/a"],
+         "Due": ["2025-11-01", "11/03/2025", "bad", None]},
+        index=["a", "a", "b", "b"],
+    )
+    rules = [
+        {"scope": "row", "target_column": "Status",
+         "condition": {"type": "contains", "value": "act"}, "style": {"bold": True}},
+        {"scope": "cell", "target_column": "Qty",
+         "condition": {"type": "numeric", "operator": "<", "value": 10}, "style": {"bg_color": "#FF0000"}},
+        {"scope": "cell", "target_column": "Due",
+         "condition": {"type": "date_compare", "operator": ">", "value": "2025-11-02"}, "style": {"bold": True}},
+    ]
+    sm = evaluate_formatting_rules(df, rules)
+    assert sorted(sm["rows"]) == [0, 2]
+    assert sorted(sm["cells"]) == [(1, 1), (2, 2), (3, 1)]
+    assert sm["warnings"] == ["'Due' date comparison: 2 invalid dates"]
+
+    scale = {"scope": "cell", "target_column": "Qty",
+             "condition": {"type": "color_scale", "scale_type": "numeric"}, "style": {}}
+    cells = evaluate_formatting_rules(df, [scale])["cells"]
+    assert sorted(cells) == [(1, 1), (2, 1), (3, 1)]
+    assert cells[(1, 1)] == {"bg_color": "#00FF00"} and cells[(2, 1)] == {"bg_color": "#FF0000"}
+
+
+def test_format_column_dates_match_format_value():
+    from reportlabcustom.utils import format_column, format_value
+
+    # Day-first value first: each value must still be read on its own
+    s = pd.Series(["13/02/2025", "01/03/2025", "n/a", "None", ""], index=[5, 5, 6, 7, 8])
+    spec = {"type": "date", "format": "DD MMM YYYY"}
+    out = format_column(s, spec)
+    assert list(out.index) == [5, 5, 6, 7, 8]
+    assert out.tolist() == [format_value(v, spec) for v in s.tolist()]
+    assert out.tolist()[:2] == ["13 Feb 2025", "03 Jan 2025"]
+
+
+def test_formatting_rules_threaded_match_sequential():
+    from reportlabcustom.utils import evaluate_formatting_rules
+
+    df = pd.DataFrame({
+        "Qty": [1, 5, 9, 12, None] * 20,
+        "Status": ["Active", "Pending", "Closed", "Active", None] * 20,
+        "Due": ["2025-01-05", "2025-02-10", "bad", "2025-03-01", None] * 20,
+    })
+    rules = [
+        {"scope": "cell", "target_column": "Qty",
+         "condition": {"type": "numeric", "operator": ">", "value": 4}, "style": {"bold": True}},
+        {"scope": "cell", "target_column": "Qty",
+         "condition": {"type": "color_scale", "scale_type": "numeric"}, "style": {}},
+        {"scope": "row", "target_column": "Status",
+         "condition": {"type": "equals", "value": "Active"}, "style": {"bg_color": "#EEEEEE"}},
+        {"scope": "cell", "target_column": "Due",
+         "condition": {"type": "date_compare", "operator": "<", "value": "2025-02-01"}, "style": {"bold": True}},
+        {"scope": "cell", "target_column": "Due",
+         "condition": {"type": "color_scale", "scale_type": "date"}, "style": {}},
+    ]
+    seq = evaluate_formatting_rules(df, rules)
+    par = evaluate_formatting_rules(df, rules, max_workers=3)
+    assert par == seq
+    assert list(par["cells"]) == list(seq["cells"])
+
+
+def test_numeric_rule_accepts_numpy_and_decimal_thresholds():
+    from decimal import Decimal
+
+    import numpy as np
+
+    from reportlabcustom.utils import evaluate_formatting_rules
+
+    df = pd.DataFrame({"Qty": [1, 5, 10]})
+    for thr in (np.int64(10), Decimal("10")):
+        rule = {"scope": "cell", "target_column": "Qty",
+                "condition": {"type": "numeric", "operator": "<", "value": thr}, "style": {"bold": True}}
+        assert sorted(evaluate_formatting_rules(df, [rule])["cells"]) == [(1, 0), (2, 0)]
+
+
+def test_categorical_scale_warning_lists_first_unmapped_values():
+    from reportlabcustom.utils import evaluate_formatting_rules
+
+    df = pd.DataFrame({"Status": ["Open", "zeta", "Done", "alpha", "zeta", "mid", None, "beta"]})
+    rule = {"scope": "cell", "target_column": "Status",
+            "condition": {"type": "color_scale", "scale_type": "categorical",
+                          "color_map": {"Open": "#00FF00", "Done": "#0000FF"}}, "style": {}}
+    sm = evaluate_formatting_rules(df, [rule])
+    assert sorted(sm["cells"]) == [(1, 0), (3, 0)]
+    assert sm["warnings"] == ["'Status' categorical color scale: 5 unmapped values (zeta, alpha, mid...)"]